@@ -11,17 +11,14 @@ This is the main orchestrator for the ticket sales agent that:
 
 import asyncio
 import logging
-from dotenv import load_dotenv
 
+from src.utils.config import get_config
 from src.agents.orchestrator import AgentOrchestrator
-from src.databases.weaviate_client import WeaviateClient
-from src.databases.neo4j_client import Neo4jClient
+from src.databases.pool import get_clients, close_clients
 from src.vapi.caller import VAPIClient
+from src.vapi.http_client import close_http_client
 from src.mcp.server import MCPServer
 
-# Load environment variables
-load_dotenv()
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,14 +29,17 @@ async def main():
     logger.info("Starting Ticket Sales Agent...")
     
     try:
+        config = get_config()
+        
         # Initialize components
-        weaviate_client = WeaviateClient()
-        neo4j_client = Neo4jClient()
-        vapi_client = VAPIClient()
+        (weaviate_client, neo4j_client), vapi_client = await asyncio.gather(
+            get_clients(config.database),
+            asyncio.to_thread(VAPIClient, config.vapi, config.openai)
+        )
         
         # Start MCP server
-        mcp_server = MCPServer()
-        await mcp_server.start()
+        mcp_server = MCPServer(neo4j_client=neo4j_client)
+        await mcp_server.start(config.mcp.host, config.mcp.port)
         
         # Initialize agent orchestrator
         orchestrator = AgentOrchestrator(
@@ -55,6 +55,8 @@ async def main():
         logger.error(f"Error in main execution: {e}")
     finally:
         logger.info("Shutting down Ticket Sales Agent...")
+        await close_clients()
+        await close_http_client()
 
 
 if __name__ == "__main__":
@@ -14,10 +14,11 @@ import os
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from src.utils.config import get_config
 from src.agents.orchestrator import AgentOrchestrator
-from src.databases.weaviate_client import WeaviateClient
-from src.databases.neo4j_client import Neo4jClient
+from src.databases.pool import get_clients, close_clients
 from src.vapi.caller import VAPIClient
+from src.vapi.http_client import close_http_client
 from src.mcp.server import MCPServer
 
 # Configure logging
@@ -38,14 +39,17 @@ async def make_sample_call():
     logger.info("Initializing ticket sales agent components...")
     
     try:
-        # Initialize database clients
-        weaviate_client = WeaviateClient()
-        neo4j_client = Neo4jClient()
-        vapi_client = VAPIClient()
+        config = get_config()
+        
+        # Get shared database clients
+        (weaviate_client, neo4j_client), vapi_client = await asyncio.gather(
+            get_clients(config.database),
+            asyncio.to_thread(VAPIClient, config.vapi, config.openai)
+        )
         
         # Start MCP server
-        mcp_server = MCPServer()
-        await mcp_server.start()
+        mcp_server = MCPServer(neo4j_client=neo4j_client)
+        await mcp_server.start(config.mcp.host, config.mcp.port)
         
         # Initialize orchestrator
         orchestrator = AgentOrchestrator(
@@ -86,12 +90,10 @@ async def make_sample_call():
     finally:
         # Cleanup
         logger.info("Cleaning up resources...")
-        if 'weaviate_client' in locals():
-            weaviate_client.close()
-        if 'neo4j_client' in locals():
-            neo4j_client.close()
         if 'mcp_server' in locals():
             await mcp_server.stop()
+        await close_clients()
+        await close_http_client()
 
 
 async def check_system_status():
@@ -100,10 +102,11 @@ async def check_system_status():
     logger.info("Checking system status...")
     
     try:
+        config = get_config()
+        
         # Initialize components
-        weaviate_client = WeaviateClient()
-        neo4j_client = Neo4jClient()
-        vapi_client = VAPIClient()
+        weaviate_client, neo4j_client = await get_clients(config.database)
+        vapi_client = VAPIClient(config.vapi, config.openai)
         
         orchestrator = AgentOrchestrator(
             weaviate_client=weaviate_client,
@@ -111,8 +114,9 @@ async def check_system_status():
             vapi_client=vapi_client
         )
         
-        # Get system status
+        # Get system status, probing all services concurrently
         status = orchestrator.get_system_status()
+        status['database_connections'] = await orchestrator.probe_connections(timeout=2.0)
         
         logger.info("📊 System Status:")
         logger.info(f"  Orchestrator: {status['orchestrator_status']}")
@@ -123,18 +127,22 @@ async def check_system_status():
         db_status = status['database_connections']
         logger.info(f"    Weaviate: {'✅ Connected' if db_status['weaviate'] else '❌ Disconnected'}")
         logger.info(f"    Neo4j: {'✅ Connected' if db_status['neo4j'] else '❌ Disconnected'}")
+        logger.info(f"    VAPI: {'✅ Connected' if db_status['vapi'] else '❌ Disconnected'}")
         
         logger.info("  Agents:")
         for agent_name, agent_status in status['agents'].items():
-            logger.info(f"    {agent_name}: {agent_status['status']} "
-                       f"(Queue: {agent_status['queued_tasks']}, "
-                       f"Cache: {agent_status['cached_results']})")
+            logger.info("    %s: %s (Queue: %s, Cache: %s)",
+                        agent_name, agent_status['status'],
+                        agent_status['queued_tasks'], agent_status['cached_results'])
         
         return status
         
     except Exception as e:
         logger.error(f"Error checking system status: {e}")
         return {"error": str(e)}
+    
+    finally:
+        await close_clients()
 
 
 if __name__ == "__main__":
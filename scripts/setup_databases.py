@@ -14,6 +14,8 @@ import os
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from weaviate.util import generate_uuid5
+
 from src.databases.weaviate_client import WeaviateClient
 from src.databases.neo4j_client import Neo4jClient
 
@@ -27,12 +29,12 @@ async def setup_weaviate_data():
     
     client = WeaviateClient()
     
-    # Sample games data
+    # Sample games data; dates are RFC3339 so they load into the DATE-typed "date" property
     sample_games = [
         {
             "title": "Lakers vs Warriors",
             "sport": "Basketball",
-            "date": "2024-01-15",
+            "date": "2024-01-15T19:30:00Z",
             "venue": "Crypto.com Arena",
             "teams": ["Lakers", "Warriors"],
             "description": "Exciting NBA matchup between two championship contenders"
@@ -40,7 +42,7 @@ async def setup_weaviate_data():
         {
             "title": "Chiefs vs Patriots",
             "sport": "Football",
-            "date": "2024-01-20",
+            "date": "2024-01-20T18:00:00Z",
             "venue": "Arrowhead Stadium",
             "teams": ["Chiefs", "Patriots"],
             "description": "AFC Championship playoff game with playoff implications"
@@ -48,76 +50,126 @@ async def setup_weaviate_data():
         {
             "title": "Dodgers vs Giants",
             "sport": "Baseball",
-            "date": "2024-04-10",
+            "date": "2024-04-10T19:10:00Z",
             "venue": "Dodger Stadium", 
             "teams": ["Dodgers", "Giants"],
             "description": "Classic rivalry game in beautiful Los Angeles weather"
         }
     ]
     
-    logger.info("Note: Actual data insertion would require proper Weaviate schema setup")
-    logger.info(f"Sample games prepared: {len(sample_games)} games")
+    try:
+        # Schema first, otherwise autoschema would type "date" as text
+        await client.ensure_schema()
+        
+        # Deterministic UUIDs make re-running the setup overwrite instead of duplicate
+        with client.games.batch.dynamic() as batch:
+            for game in sample_games:
+                batch.add_object(properties=game, uuid=generate_uuid5(game["title"]))
+        
+        failed = client.games.batch.failed_objects
+        if failed:
+            logger.error(f"Failed to load {len(failed)} games: {failed[0].message}")
+        logger.info(f"Loaded {len(sample_games) - len(failed)} games")
+        
+    finally:
+        client.close()
     
-    client.close()
     return sample_games
 
 
+# Parameterized bulk-load statements: each is parsed and planned once per batch of rows
+NEO4J_LOAD_QUERIES = {
+    "users": """
+        UNWIND $rows AS row
+        MERGE (u:User {id: row.id})
+        SET u.name = row.name, u.email = row.email, u.phone = row.phone,
+            u.created_at = datetime()
+    """,
+    "sports": """
+        UNWIND $rows AS row
+        MERGE (:Sport {name: row.name})
+    """,
+    "teams": """
+        UNWIND $rows AS row
+        MERGE (:Team {name: row.name})
+    """,
+    "games": """
+        UNWIND $rows AS row
+        MERGE (g:Game {id: row.id})
+        SET g.title = row.title, g.date = row.date, g.venue = row.venue
+    """,
+    "prefers": """
+        UNWIND $rows AS row
+        MATCH (u:User {id: row.user_id}), (s:Sport {name: row.sport})
+        MERGE (u)-[:PREFERS]->(s)
+    """,
+    "interested_in": """
+        UNWIND $rows AS row
+        MATCH (u:User {id: row.user_id}), (t:Team {name: row.team})
+        MERGE (u)-[:INTERESTED_IN]->(t)
+    """,
+    "attended": """
+        UNWIND $rows AS row
+        MATCH (u:User {id: row.user_id}), (g:Game {id: row.game_id})
+        MERGE (u)-[a:ATTENDED]->(g)
+        SET a.ticket_type = row.ticket_type,
+            a.satisfaction_rating = row.satisfaction_rating,
+            a.attended_date = row.attended_date
+    """,
+}
+
+# Sample rows for each load statement
+NEO4J_SAMPLE_DATA = {
+    "users": [
+        {"id": "user123", "name": "John Doe", "email": "john@example.com", "phone": "+1234567890"}
+    ],
+    "sports": [{"name": "Basketball"}, {"name": "Football"}],
+    "teams": [{"name": "Lakers"}, {"name": "Warriors"}],
+    "games": [
+        {"id": "game1", "title": "Lakers vs Warriors", "date": "2024-01-15", "venue": "Crypto.com Arena"}
+    ],
+    "prefers": [{"user_id": "user123", "sport": "Basketball"}],
+    "interested_in": [{"user_id": "user123", "team": "Lakers"}],
+    "attended": [
+        {
+            "user_id": "user123",
+            "game_id": "game1",
+            "ticket_type": "Premium",
+            "satisfaction_rating": 5,
+            "attended_date": "2024-01-15"
+        }
+    ],
+}
+
+
+async def _load_neo4j_sample_data(tx):
+    """Run every bulk-load statement inside a single write transaction."""
+    for name, query in NEO4J_LOAD_QUERIES.items():
+        result = await tx.run(query, rows=NEO4J_SAMPLE_DATA[name])
+        await result.consume()
+
+
 async def setup_neo4j_data():
     """Set up sample user data in Neo4j."""
     logger.info("Setting up Neo4j sample data...")
     
     client = Neo4jClient()
+    await client.verify_connectivity()
     
-    # Sample Cypher queries to create test data
-    sample_queries = [
-        """
-        // Create sample users
-        CREATE (u1:User {
-            id: 'user123',
-            name: 'John Doe',
-            email: 'john@example.com',
-            phone: '+1234567890',
-            created_at: datetime()
-        })
-        """,
-        """
-        // Create sample sports and teams
-        CREATE (s1:Sport {name: 'Basketball'})
-        CREATE (s2:Sport {name: 'Football'})
-        CREATE (t1:Team {name: 'Lakers'})
-        CREATE (t2:Team {name: 'Warriors'})
-        """,
-        """
-        // Create sample games
-        CREATE (g1:Game {
-            id: 'game1',
-            title: 'Lakers vs Warriors',
-            date: '2024-01-15',
-            venue: 'Crypto.com Arena'
-        })
-        """,
-        """
-        // Create relationships
-        MATCH (u:User {id: 'user123'})
-        MATCH (s:Sport {name: 'Basketball'})
-        MATCH (t:Team {name: 'Lakers'})
-        MATCH (g:Game {id: 'game1'})
-        CREATE (u)-[:PREFERS]->(s)
-        CREATE (u)-[:INTERESTED_IN]->(t)
-        CREATE (u)-[:ATTENDED {
-            ticket_type: 'Premium',
-            satisfaction_rating: 5,
-            attended_date: '2024-01-15'
-        }]->(g)
-        """
-    ]
-    
-    logger.info("Note: Actual data insertion would execute these Cypher queries:")
-    for i, query in enumerate(sample_queries, 1):
-        logger.info(f"Query {i}: {query.strip()[:50]}...")
+    try:
+        # Constraints are created first so the UNWIND MERGEs below use index seeks
+        await client.ensure_schema()
+        
+        async with client.session() as session:
+            await session.execute_write(_load_neo4j_sample_data)
+        
+        for name, rows in NEO4J_SAMPLE_DATA.items():
+            logger.info(f"Loaded {len(rows)} {name} rows")
+        
+    finally:
+        await client.close()
     
-    client.close()
-    return sample_queries
+    return NEO4J_SAMPLE_DATA
 
 
 async def verify_setup():
@@ -132,8 +184,9 @@ async def verify_setup():
         
         # Test Neo4j connection  
         neo4j_client = Neo4jClient()
+        await neo4j_client.verify_connectivity()
         logger.info("✅ Neo4j connection successful")
-        neo4j_client.close()
+        await neo4j_client.close()
         
         logger.info("🎉 Database setup verification completed!")
         return True
@@ -5,70 +5,105 @@ Base Agent Class for Strands Multi-Agent Architecture
 Base class that all agents in the system inherit from.
 """
 
+import asyncio
+import atexit
+import hashlib
+import itertools
 import logging
+import os
+import time
+from time import perf_counter
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
-from enum import Enum
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Any, Final, List, Optional, Tuple
+from src.agents.result_store import ResultStore
+from src.utils.serialization import dumps, loads
+from src.utils.batch_logger import BatchLogger
+from dataclasses import dataclass, field, replace
 
 logger = logging.getLogger(__name__)
 
+# Per-task debug events are buffered; INFO and above are still logged immediately
+_batch_logger = BatchLogger(logger)
 
-class AgentStatus(Enum):
-    """Agent execution status."""
-    IDLE = "idle"
-    PROCESSING = "processing"
-    COMPLETED = "completed"
-    ERROR = "error"
 
+class AgentStatus:
+    """Agent execution status values, kept as plain strings for cheap comparisons."""
+    IDLE: Final = "idle"
+    PROCESSING: Final = "processing"
+    COMPLETED: Final = "completed"
+    ERROR: Final = "error"
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class AgentTask:
     """Represents a task for an agent to execute."""
     id: str
     type: str
     data: Dict[str, Any]
     priority: int = 1
-    dependencies: List[str] = None
-    
-    def __post_init__(self):
-        if self.dependencies is None:
-            self.dependencies = []
+    dependencies: List[str] = field(default_factory=list)
+    cpu_offload: bool = False  # Hint that CPU-heavy work may run in the shared process pool
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentResult:
     """Result of agent task execution."""
     task_id: str
     agent_id: str
-    status: AgentStatus
-    data: Dict[str, Any] = None
+    status: str
+    data: Dict[str, Any] = field(default_factory=dict)
     error: Optional[str] = None
     execution_time: Optional[float] = None
+
+
+def task_cache_key(task: AgentTask) -> str:
+    """
+    Compute a stable cache key from a task's type and data.
     
-    def __post_init__(self):
-        if self.data is None:
-            self.data = {}
+    Args:
+        task: Task to compute the key for
+        
+    Returns:
+        Hex digest identifying the task's content
+    """
+    payload = dumps({"t": task.type, "d": task.data}, sort_keys=True)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
 
 class BaseAgent(ABC):
     """Base class for all agents in the system."""
     
-    def __init__(self, agent_id: str, name: str):
+    # Process pool shared by all agents for CPU-bound work, created on first use
+    _pool: Optional[ProcessPoolExecutor] = None
+    
+    # On-disk store for cached payloads over cache_spill_bytes, shared by all agents
+    _result_store: Optional[ResultStore] = None
+    
+    def __init__(self, agent_id: str, name: str, cache_maxsize: int = 512,
+                 cache_ttl_seconds: float = 300, cache_spill_bytes: int = 64 * 1024):
         """
         Initialize base agent.
         
         Args:
             agent_id: Unique identifier for the agent
             name: Human-readable name for the agent
+            cache_maxsize: Maximum number of cached results
+            cache_ttl_seconds: Age after which a cached result is ignored
+            cache_spill_bytes: Cached payloads larger than this are kept on disk
         """
         self.agent_id = agent_id
         self.name = name
         self.status = AgentStatus.IDLE
-        self.tasks_queue = []
-        self.results_cache = {}
+        self.tasks_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._task_seq = itertools.count()
+        self.results_cache: "OrderedDict[str, Tuple[AgentResult, float]]" = OrderedDict()
+        self.cache_maxsize = cache_maxsize
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_spill_bytes = cache_spill_bytes
         
-        logger.info(f"Initialized agent: {self.name} ({self.agent_id})")
+        logger.info("Initialized agent: %s (%s)", self.name, self.agent_id)
     
     @abstractmethod
     async def process_task(self, task: AgentTask) -> AgentResult:
@@ -93,23 +128,28 @@ class BaseAgent(ABC):
         Returns:
             Task execution result
         """
-        import time
+        # Fast path: cache hits skip status transitions and timing entirely
+        cache_key = task_cache_key(task)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            _batch_logger.debug("cache_hit", task.id, self.name)
+            return cached if cached.task_id == task.id else replace(cached, task_id=task.id)
         
-        start_time = time.time()
+        start_time = perf_counter()
         self.status = AgentStatus.PROCESSING
         
         try:
-            logger.info(f"Agent {self.name} starting task {task.id}")
+            logger.info("Agent %s starting task %s", self.name, task.id)
             
             result = await self.process_task(task)
-            result.execution_time = time.time() - start_time
+            result.execution_time = perf_counter() - start_time
             
             # Cache successful results
             if result.status == AgentStatus.COMPLETED:
-                self.results_cache[task.id] = result
+                self._cache_store(cache_key, result)
             
             self.status = AgentStatus.COMPLETED
-            logger.info(f"Agent {self.name} completed task {task.id} in {result.execution_time:.2f}s")
+            logger.info("Agent %s completed task %s in %.2fs", self.name, task.id, result.execution_time)
             
             return result
             
@@ -124,35 +164,135 @@ class BaseAgent(ABC):
                 agent_id=self.agent_id,
                 status=AgentStatus.ERROR,
                 error=error_msg,
-                execution_time=time.time() - start_time
+                execution_time=perf_counter() - start_time
             )
     
+    @classmethod
+    def _get_pool(cls) -> ProcessPoolExecutor:
+        """Get the shared process pool, creating it on first use."""
+        if BaseAgent._pool is None:
+            BaseAgent._pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+            atexit.register(BaseAgent._pool.shutdown)
+        return BaseAgent._pool
+    
+    async def run_cpu(self, fn: Callable, *args) -> Any:
+        """
+        Run a CPU-bound function in the shared process pool.
+        
+        Only pass picklable, pure functions (text normalization, validation, scoring).
+        Database and network calls must stay on the event loop and never go through here.
+        
+        Args:
+            fn: Module-level function to execute
+            *args: Picklable arguments for the function
+            
+        Returns:
+            Return value of the function
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), fn, *args)
+    
     def add_task(self, task: AgentTask):
         """
         Add a task to the agent's queue.
         
+        Higher priority tasks are dequeued first; equal priorities keep FIFO order.
+        
         Args:
             task: Task to add
         """
-        self.tasks_queue.append(task)
-        logger.debug(f"Added task {task.id} to agent {self.name}")
+        self.tasks_queue.put_nowait((-task.priority, next(self._task_seq), task))
+        _batch_logger.debug("add", task.id, self.name)
+    
+    async def next_task(self) -> AgentTask:
+        """
+        Wait for and return the highest priority queued task.
+        
+        Returns:
+            Next task to execute
+        """
+        _, _, task = await self.tasks_queue.get()
+        return task
     
-    def get_cached_result(self, task_id: str) -> Optional[AgentResult]:
+    async def run_worker(self):
+        """Continuously execute queued tasks in priority order."""
+        while True:
+            task = await self.next_task()
+            try:
+                await self.execute_task(task)
+            finally:
+                self.tasks_queue.task_done()
+    
+    def get_cached_result(self, task: AgentTask) -> Optional[AgentResult]:
         """
-        Get cached result for a task.
+        Get cached result for a task with the same type and data.
         
         Args:
-            task_id: Task identifier
+            task: Task to look up
             
         Returns:
             Cached result if available, None otherwise
         """
-        return self.results_cache.get(task_id)
+        return self._cache_lookup(task_cache_key(task))
+    
+    @classmethod
+    def _get_result_store(cls) -> ResultStore:
+        """Get the shared on-disk result store, creating it on first use."""
+        if BaseAgent._result_store is None:
+            BaseAgent._result_store = ResultStore()
+        return BaseAgent._result_store
+    
+    def _cache_lookup(self, key: str) -> Optional[AgentResult]:
+        """Return a fresh cached result for the key, dropping it if expired."""
+        entry = self.results_cache.get(key)
+        if entry is None:
+            return None
+        
+        result, stored_at = entry
+        if time.monotonic() - stored_at > self.cache_ttl_seconds:
+            del self.results_cache[key]
+            self._discard_spilled(key, result)
+            return None
+        
+        if result.data.get("__disk__"):
+            payload = self._get_result_store().get(self.agent_id, key)
+            if payload is None:
+                del self.results_cache[key]
+                return None
+            result = replace(result, data=loads(payload))
+        
+        self.results_cache.move_to_end(key)
+        return result
+    
+    def _cache_store(self, key: str, result: AgentResult):
+        """Store a result, evicting the least recently used entries over capacity."""
+        # Stored pre-tagged as a cache hit so lookups only need to swap the task id
+        cached = replace(result, data={**result.data, "cache_hit": True}, execution_time=0.0)
+        
+        # Keep only a marker in memory for large payloads. orjson both sizes the payload
+        # cheaply and stores it as plain JSON, so reading it back never runs code
+        payload = dumps(cached.data)
+        if len(payload) > self.cache_spill_bytes:
+            self._get_result_store().put(self.agent_id, key, payload)
+            cached = replace(cached, data={"__disk__": True})
+        
+        self.results_cache[key] = (cached, time.monotonic())
+        self.results_cache.move_to_end(key)
+        while len(self.results_cache) > self.cache_maxsize:
+            evicted_key, (evicted, _) = self.results_cache.popitem(last=False)
+            self._discard_spilled(evicted_key, evicted)
+    
+    def _discard_spilled(self, key: str, result: AgentResult):
+        """Remove a dropped cache entry's payload from disk if it was spilled."""
+        if result.data.get("__disk__"):
+            self._get_result_store().delete(self.agent_id, key)
     
     def clear_cache(self):
         """Clear the results cache."""
         self.results_cache.clear()
-        logger.debug(f"Cleared cache for agent {self.name}")
+        if BaseAgent._result_store is not None:
+            BaseAgent._result_store.clear(self.agent_id)
+        logger.debug("Cleared cache for agent %s", self.name)
     
     def get_status(self) -> Dict[str, Any]:
         """
@@ -164,7 +304,7 @@ class BaseAgent(ABC):
         return {
             "agent_id": self.agent_id,
             "name": self.name,
-            "status": self.status.value,
-            "queued_tasks": len(self.tasks_queue),
+            "status": self.status,
+            "queued_tasks": self.tasks_queue.qsize(),
             "cached_results": len(self.results_cache)
         }
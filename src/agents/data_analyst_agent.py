@@ -6,12 +6,95 @@ Analyzes user data from Neo4j and game data from Weaviate to create insights
 for the sales conversation.
 """
 
+import bisect
+import functools
+import heapq
 import logging
-from typing import Dict, Any, List
+import pickle
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
 from src.agents.base_agent import BaseAgent, AgentTask, AgentResult, AgentStatus
 
 logger = logging.getLogger(__name__)
 
+RECENT_GAMES = 5  # Attended games averaged for engagement
+RISK_WINDOW = 3   # Most recent games checked for low satisfaction
+
+# Bucket tables: a value's label is LABELS[bisect(CUTS, value)]
+ENGAGEMENT_CUTS = (3.5, 4.5)         # average rating >= cut moves up a level
+ENGAGEMENT_LABELS = ("Low", "Medium", "High")
+PRIORITY_CUTS = (0.6, 0.8)           # match score > cut moves up a level
+PRIORITY_LABELS = ("low", "medium", "high")
+SPENDING_CUTS = (0.3,)               # premium share > cut is high-value
+SPENDING_LABELS = ("Value-Conscious", "High-Value")
+
+
+@dataclass(slots=True)
+class HistoryStats:
+    """Per-user metrics collected in a single pass over the game history."""
+    count: int = 0
+    recent_rating_sum: float = 0.0
+    recent_count: int = 0
+    ticket_types: Counter = field(default_factory=Counter)
+    latest: Optional[Dict[str, Any]] = None
+    first_ratings: List[float] = field(default_factory=list)
+
+
+@functools.lru_cache(maxsize=4096)
+def _segment_for(history_bucket: int, has_teams: bool, has_sports: bool) -> str:
+    """Map a capped history length and preference flags to a user segment."""
+    if history_bucket >= 10:
+        return "VIP_Fan"
+    elif history_bucket >= 5:
+        return "Regular_Attendee"
+    elif history_bucket >= 2:
+        return "Occasional_Fan"
+    elif has_teams or has_sports:
+        return "Interested_Prospect"
+    else:
+        return "New_Prospect"
+
+
+@functools.lru_cache(maxsize=64)
+def _opening_approach_for(segment: str) -> str:
+    """Map a user segment to a conversation opener."""
+    if segment == "VIP_Fan":
+        return "Reference their loyalty and offer exclusive opportunities"
+    elif segment == "Regular_Attendee":
+        return "Mention their attendance history and suggest similar games"
+    else:
+        return "Focus on introducing the experience and building interest"
+
+
+DEFAULT_CONTACT_PREFERENCES = {
+    "preferred_method": "phone",  # Could be derived from profile
+    "best_time": "evening",       # Could be derived from history
+    "tone": "friendly"            # Could be derived from past interactions
+}
+
+
+@dataclass(slots=True)
+class MatchedGame:
+    """A game scored against a user, with the reasons it was picked."""
+    game: Dict[str, Any]
+    match_score: float
+    reasons: List[str]
+    priority: str
+
+
+# Analyst used inside process pool workers, created on first use in each worker
+_worker_analyst: Optional["DataAnalystAgent"] = None
+
+
+def _run_stage_in_worker(stage: str, *args) -> Any:
+    """Run a synchronous analysis stage in a worker process."""
+    global _worker_analyst
+    if _worker_analyst is None:
+        _worker_analyst = DataAnalystAgent()
+    return getattr(_worker_analyst, stage)(*args)
+
 
 class DataAnalystAgent(BaseAgent):
     """Agent responsible for analyzing user and game data."""
@@ -48,19 +131,7 @@ class DataAnalystAgent(BaseAgent):
         """
         try:
             user_data = task.data.get("user_data", {})
-            profile = user_data.get("profile", {})
-            history = user_data.get("history", [])
-            preferences = user_data.get("preferences", {})
-            
-            analysis = {
-                "user_segment": self._determine_user_segment(history, preferences),
-                "engagement_level": self._calculate_engagement_level(history),
-                "preferred_categories": self._extract_preferred_categories(history, preferences),
-                "spending_pattern": self._analyze_spending_pattern(history),
-                "last_activity": self._get_last_activity(history),
-                "contact_preferences": self._determine_contact_preferences(profile),
-                "risk_factors": self._identify_risk_factors(history, preferences)
-            }
+            analysis = await self._run_stage(task, "_build_user_analysis", user_data)
             
             return AgentResult(
                 task_id=task.id,
@@ -91,27 +162,15 @@ class DataAnalystAgent(BaseAgent):
             user_analysis = task.data.get("user_analysis", {})
             available_games = task.data.get("available_games", [])
             
-            matched_games = []
-            
-            for game in available_games:
-                score = self._calculate_game_match_score(game, user_analysis)
-                reasons = self._generate_match_reasons(game, user_analysis)
-                
-                matched_games.append({
-                    "game": game,
-                    "match_score": score,
-                    "reasons": reasons,
-                    "priority": "high" if score > 0.8 else "medium" if score > 0.6 else "low"
-                })
-            
-            # Sort by match score
-            matched_games.sort(key=lambda x: x["match_score"], reverse=True)
+            matched_games = await self._run_stage(
+                task, "_build_game_matches", user_analysis, available_games
+            )
             
             return AgentResult(
                 task_id=task.id,
                 agent_id=self.agent_id,
                 status=AgentStatus.COMPLETED,
-                data={"matched_games": matched_games[:5]}  # Top 5 matches
+                data={"matched_games": matched_games}
             )
             
         except Exception as e:
@@ -136,15 +195,9 @@ class DataAnalystAgent(BaseAgent):
             user_analysis = task.data.get("user_analysis", {})
             matched_games = task.data.get("matched_games", [])
             
-            insights = {
-                "opening_approach": self._suggest_opening_approach(user_analysis),
-                "key_talking_points": self._generate_talking_points(user_analysis, matched_games),
-                "potential_objections": self._predict_objections(user_analysis),
-                "recommended_offers": self._suggest_offers(matched_games),
-                "conversation_style": self._recommend_conversation_style(user_analysis),
-                "best_contact_time": self._suggest_contact_time(user_analysis),
-                "follow_up_strategy": self._plan_follow_up_strategy(user_analysis)
-            }
+            insights = await self._run_stage(
+                task, "_build_conversation_insights", user_analysis, matched_games
+            )
             
             return AgentResult(
                 task_id=task.id,
@@ -161,35 +214,140 @@ class DataAnalystAgent(BaseAgent):
                 error=str(e)
             )
     
-    def _determine_user_segment(self, history: List[Dict], preferences: Dict) -> str:
+    async def _run_stage(self, task: AgentTask, stage: str, *args) -> Any:
+        """
+        Run a synchronous analysis stage, in the process pool if the task asks for it.
+        
+        Args:
+            task: Task being processed
+            stage: Name of the stage method to run
+            *args: Arguments for the stage
+            
+        Returns:
+            Stage result
+        """
+        if task.cpu_offload:
+            try:
+                # Checked up front: pickle signals unpicklable data with TypeError/AttributeError
+                # too, which must not be confused with the same errors raised by the stage itself
+                pickle.dumps(args, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                logger.warning(f"Arguments for {stage} cannot be sent to the process pool, running inline: {e}")
+            else:
+                try:
+                    return await self.run_cpu(_run_stage_in_worker, stage, *args)
+                except BrokenProcessPool as e:
+                    logger.warning(f"Process pool unavailable for {stage}, running inline: {e}")
+        
+        return getattr(self, stage)(*args)
+    
+    def _build_user_analysis(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Derive the user analysis from profile, history and preferences."""
+        profile = user_data.get("profile", {})
+        preferences = user_data.get("preferences", {})
+        stats = self._scan_history(user_data.get("history", []))
+        
+        return {
+            "user_segment": self._determine_user_segment(stats, preferences),
+            "engagement_level": self._calculate_engagement_level(stats),
+            "preferred_categories": self._extract_preferred_categories(stats, preferences),
+            "spending_pattern": self._analyze_spending_pattern(stats),
+            "last_activity": self._get_last_activity(stats),
+            "contact_preferences": self._determine_contact_preferences(profile),
+            "risk_factors": self._identify_risk_factors(stats, preferences)
+        }
+    
+    def _scan_history(self, history: List[Dict]) -> HistoryStats:
+        """
+        Collect every history-derived metric in one pass.
+        
+        Args:
+            history: User's game history, most recent first
+            
+        Returns:
+            Aggregated history statistics
+        """
+        stats = HistoryStats(count=len(history))
+        ticket_types = stats.ticket_types
+        first_ratings = stats.first_ratings
+        recent_rating_sum = 0.0
+        recent_count = 0
+        latest = None
+        latest_date = None
+        
+        for game in history:
+            get = game.get
+            rating = get("satisfaction_rating", 3)
+            attended_date = get("attended_date")
+            
+            if attended_date and recent_count < RECENT_GAMES:
+                recent_rating_sum += rating
+                recent_count += 1
+            
+            ticket_types[get("ticket_type", "Standard")] += 1
+            
+            # Keep the first game with the greatest date, as max() would
+            date_key = attended_date if attended_date is not None else ""
+            if latest is None or date_key > latest_date:
+                latest = game
+                latest_date = date_key
+            
+            if len(first_ratings) < RISK_WINDOW:
+                first_ratings.append(rating)
+        
+        stats.recent_rating_sum = recent_rating_sum
+        stats.recent_count = recent_count
+        stats.latest = latest
+        return stats
+    
+    def _build_game_matches(self, user_analysis: Dict[str, Any],
+                            available_games: List[Dict[str, Any]]) -> List[MatchedGame]:
+        """Score available games against the user analysis and keep the top 5."""
+        scores = [self._calculate_game_match_score(game, user_analysis) for game in available_games]
+        
+        # Keep the top 5 by match score, then explain only those
+        top_indexes = heapq.nlargest(5, range(len(scores)), key=scores.__getitem__)
+        
+        return [
+            MatchedGame(
+                game=available_games[i],
+                match_score=scores[i],
+                reasons=self._generate_match_reasons(available_games[i], user_analysis),
+                priority=PRIORITY_LABELS[bisect.bisect_left(PRIORITY_CUTS, scores[i])]
+            )
+            for i in top_indexes
+        ]
+    
+    def _build_conversation_insights(self, user_analysis: Dict[str, Any],
+                                     matched_games: List[MatchedGame]) -> Dict[str, Any]:
+        """Build talking points and strategy for the sales conversation."""
+        return {
+            "opening_approach": self._suggest_opening_approach(user_analysis),
+            "key_talking_points": self._generate_talking_points(user_analysis, matched_games),
+            "potential_objections": self._predict_objections(user_analysis),
+            "recommended_offers": self._suggest_offers(matched_games),
+            "conversation_style": self._recommend_conversation_style(user_analysis),
+            "best_contact_time": self._suggest_contact_time(user_analysis),
+            "follow_up_strategy": self._plan_follow_up_strategy(user_analysis)
+        }
+    
+    def _determine_user_segment(self, stats: HistoryStats, preferences: Dict) -> str:
         """Determine user segment based on history and preferences."""
-        if len(history) >= 10:
-            return "VIP_Fan"
-        elif len(history) >= 5:
-            return "Regular_Attendee"
-        elif len(history) >= 2:
-            return "Occasional_Fan"
-        elif preferences.get("favorite_teams") or preferences.get("favorite_sports"):
-            return "Interested_Prospect"
-        else:
-            return "New_Prospect"
+        return _segment_for(
+            min(stats.count, 10),
+            bool(preferences.get("favorite_teams")),
+            bool(preferences.get("favorite_sports"))
+        )
     
-    def _calculate_engagement_level(self, history: List[Dict]) -> str:
+    def _calculate_engagement_level(self, stats: HistoryStats) -> str:
         """Calculate user engagement level."""
-        if not history:
+        if not stats.recent_count:
             return "Low"
         
-        recent_games = [g for g in history if g.get("attended_date")][:5]
-        avg_rating = sum(g.get("satisfaction_rating", 3) for g in recent_games) / len(recent_games)
-        
-        if avg_rating >= 4.5:
-            return "High"
-        elif avg_rating >= 3.5:
-            return "Medium"
-        else:
-            return "Low"
+        avg_rating = stats.recent_rating_sum / stats.recent_count
+        return ENGAGEMENT_LABELS[bisect.bisect_right(ENGAGEMENT_CUTS, avg_rating)]
     
-    def _extract_preferred_categories(self, history: List[Dict], preferences: Dict) -> List[str]:
+    def _extract_preferred_categories(self, stats: HistoryStats, preferences: Dict) -> List[str]:
         """Extract preferred game categories."""
         categories = set()
         
@@ -205,26 +363,27 @@ class DataAnalystAgent(BaseAgent):
         
         return list(categories)
     
-    def _analyze_spending_pattern(self, history: List[Dict]) -> Dict[str, Any]:
+    def _analyze_spending_pattern(self, stats: HistoryStats) -> Dict[str, Any]:
         """Analyze user spending patterns."""
-        if not history:
+        if not stats.count:
             return {"pattern": "Unknown", "average_ticket_type": "Standard"}
         
-        ticket_types = [g.get("ticket_type", "Standard") for g in history]
-        premium_count = sum(1 for t in ticket_types if "Premium" in t or "VIP" in t)
+        ticket_types = stats.ticket_types
+        premium_count = sum(n for t, n in ticket_types.items() if "Premium" in t or "VIP" in t)
+        premium_preference = premium_count / stats.count
         
         return {
-            "pattern": "High-Value" if premium_count / len(ticket_types) > 0.3 else "Value-Conscious",
-            "average_ticket_type": max(set(ticket_types), key=ticket_types.count),
-            "premium_preference": premium_count / len(ticket_types)
+            "pattern": SPENDING_LABELS[bisect.bisect_left(SPENDING_CUTS, premium_preference)],
+            "average_ticket_type": ticket_types.most_common(1)[0][0],
+            "premium_preference": premium_preference
         }
     
-    def _get_last_activity(self, history: List[Dict]) -> Dict[str, Any]:
+    def _get_last_activity(self, stats: HistoryStats) -> Dict[str, Any]:
         """Get information about last activity."""
-        if not history:
+        if stats.latest is None:
             return {"status": "No prior activity"}
         
-        latest = max(history, key=lambda x: x.get("attended_date", ""))
+        latest = stats.latest
         return {
             "game": latest.get("game_title", "Unknown"),
             "date": latest.get("attended_date", "Unknown"),
@@ -233,21 +392,17 @@ class DataAnalystAgent(BaseAgent):
     
     def _determine_contact_preferences(self, profile: Dict) -> Dict[str, str]:
         """Determine preferred contact methods and times."""
-        return {
-            "preferred_method": "phone",  # Could be derived from profile
-            "best_time": "evening",       # Could be derived from history
-            "tone": "friendly"            # Could be derived from past interactions
-        }
+        return dict(DEFAULT_CONTACT_PREFERENCES)
     
-    def _identify_risk_factors(self, history: List[Dict], preferences: Dict) -> List[str]:
+    def _identify_risk_factors(self, stats: HistoryStats, preferences: Dict) -> List[str]:
         """Identify potential risk factors for the sale."""
         risks = []
         
-        if not history:
+        if not stats.count:
             risks.append("No purchase history")
         
-        if history:
-            recent_ratings = [g.get("satisfaction_rating", 3) for g in history[:3]]
+        if stats.first_ratings:
+            recent_ratings = stats.first_ratings
             if sum(recent_ratings) / len(recent_ratings) < 3:
                 risks.append("Recent low satisfaction")
         
@@ -278,21 +433,14 @@ class DataAnalystAgent(BaseAgent):
     
     def _suggest_opening_approach(self, user_analysis: Dict) -> str:
         """Suggest how to open the conversation."""
-        segment = user_analysis.get("user_segment", "New_Prospect")
-        
-        if segment == "VIP_Fan":
-            return "Reference their loyalty and offer exclusive opportunities"
-        elif segment == "Regular_Attendee":
-            return "Mention their attendance history and suggest similar games"
-        else:
-            return "Focus on introducing the experience and building interest"
+        return _opening_approach_for(user_analysis.get("user_segment", "New_Prospect"))
     
-    def _generate_talking_points(self, user_analysis: Dict, matched_games: List[Dict]) -> List[str]:
+    def _generate_talking_points(self, user_analysis: Dict, matched_games: List[MatchedGame]) -> List[str]:
         """Generate key talking points for the conversation."""
         points = []
         
         if matched_games:
-            top_game = matched_games[0]["game"]
+            top_game = matched_games[0].game
             points.append(f"Highlight the {top_game.get('properties', {}).get('title', 'upcoming game')}")
         
         points.append("Emphasize the unique atmosphere and experience")
@@ -313,14 +461,14 @@ class DataAnalystAgent(BaseAgent):
             }
         ]
     
-    def _suggest_offers(self, matched_games: List[Dict]) -> List[Dict[str, Any]]:
+    def _suggest_offers(self, matched_games: List[MatchedGame]) -> List[Dict[str, Any]]:
         """Suggest specific offers to make."""
         offers = []
         
         if matched_games:
-            for game in matched_games[:2]:
+            for match in matched_games[:2]:
                 offers.append({
-                    "game": game["game"],
+                    "game": match.game,
                     "offer_type": "Standard discount",
                     "urgency": "Limited time"
                 })
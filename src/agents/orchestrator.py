@@ -7,17 +7,35 @@ for the ticket sales process.
 """
 
 import asyncio
+import itertools
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from src.agents.base_agent import AgentTask, AgentResult, AgentStatus
 from src.agents.data_analyst_agent import DataAnalystAgent
 from src.databases.weaviate_client import WeaviateClient
 from src.databases.neo4j_client import Neo4jClient
 from src.vapi.caller import VAPIClient
 from src.mcp.server import MCPServer
+from src.utils.batching import MicroBatcher
+from src.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Weaviate search results are reused across calls for this long
+SEARCH_CACHE_TTL = 60  # seconds
+SEARCH_CACHE_MAXSIZE = 1024
+GAME_SEARCH_LIMIT = 5
+
+# Pending calls accepted by schedule_call before producers have to wait
+CALL_QUEUE_MAXSIZE = 1000
+# Calls the run loop keeps in flight at once
+MAX_CONCURRENT_CALLS = 32
+
+# Smallest call batch whose analysis stages are worth shipping to worker processes
+CPU_OFFLOAD_MIN_BATCH = 4
+
 
 class AgentOrchestrator:
     """Main orchestrator for the multi-agent ticket sales system."""
@@ -38,7 +56,33 @@ class AgentOrchestrator:
         # Initialize agents
         self.data_analyst = DataAnalystAgent()
         
+        # Coalesce concurrent history lookups into one UNWIND query
+        self._history_batcher = MicroBatcher(
+            lambda user_ids: self.neo4j_client.fetch_user_histories(user_ids, limit=20),
+            max_size=32,
+            max_delay=0.02
+        )
+        
+        # Group concurrent sales calls so they share Neo4j and Weaviate lookups
+        self._call_batcher = MicroBatcher(
+            self._process_call_batch,
+            max_size=8,
+            max_delay=0.25
+        )
+        
+        # Weaviate queries each user needed on their last call, used to prefetch games
+        self._query_hints: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self._query_hints_maxsize = 1024
+        
+        # Recent Weaviate results keyed by query
+        self._search_cache = TTLCache(maxsize=SEARCH_CACHE_MAXSIZE, ttl=SEARCH_CACHE_TTL)
+        
+        # Calls waiting for the run loop
+        self._call_queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue(maxsize=CALL_QUEUE_MAXSIZE)
+        self._call_slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+        
         # Task tracking
+        self._task_ids = itertools.count(1)
         self.active_tasks = {}
         self.completed_tasks = {}
         
@@ -48,6 +92,9 @@ class AgentOrchestrator:
         """
         Process a complete sales call workflow.
         
+        Concurrent calls are grouped into micro-batches (up to 8 calls or 250 ms)
+        that share their database lookups.
+        
         Args:
             user_id: Target user identifier
             phone_number: User's phone number
@@ -55,29 +102,74 @@ class AgentOrchestrator:
         Returns:
             Results of the sales call process
         """
-        logger.info(f"Starting sales call process for user {user_id}")
+        return await self._call_batcher.get((user_id, phone_number))
+    
+    async def process_sales_calls(self, calls: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Process several sales calls as one batch.
+        
+        Args:
+            calls: List of (user_id, phone_number) pairs
+            
+        Returns:
+            Results of each sales call process, in the same order as the input
+        """
+        results = await self._process_call_batch(calls)
+        return [results[call] for call in calls]
+    
+    async def _process_call_batch(self, calls: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Run the sales call workflow for a batch, sharing lookups across calls."""
+        unique_calls = list(dict.fromkeys(calls))
+        logger.info(f"Starting sales call process for {len(unique_calls)} users")
+        
+        # Speculatively start the Weaviate searches these users needed last time,
+        # so they overlap with the Neo4j lookups below
+        shared_searches: Dict[str, asyncio.Task] = {}
+        for user_id, _ in unique_calls:
+            for query in self._query_hints.get(user_id, ()):
+                self._start_search(query, shared_searches)
+        
+        # Step 1: Gather user data for the whole batch from Neo4j
+        user_data_list = await self._gather_user_data_batch([user_id for user_id, _ in unique_calls])
+        
+        self._update_query_hints(unique_calls, user_data_list, shared_searches)
         
+        # Larger batches run the CPU-heavy analysis stages in the shared process pool
+        cpu_offload = len(unique_calls) >= CPU_OFFLOAD_MIN_BATCH
+        results = await asyncio.gather(*(
+            self._complete_sales_call(user_id, phone_number, user_data, shared_searches, cpu_offload)
+            for (user_id, phone_number), user_data in zip(unique_calls, user_data_list)
+        ))
+        
+        return dict(zip(unique_calls, results))
+    
+    async def _complete_sales_call(self, user_id: str, phone_number: str,
+                                   user_data: Optional[Dict[str, Any]],
+                                   shared_searches: Optional[Dict[str, asyncio.Task]] = None,
+                                   cpu_offload: bool = False) -> Dict[str, Any]:
+        """Search, analyze, call, and record a single user once their data has been gathered."""
         try:
-            # Step 1: Gather user data from Neo4j
-            user_data = await self._gather_user_data(user_id)
             if not user_data:
                 return {"error": f"Could not retrieve data for user {user_id}"}
             
-            # Step 2: Get relevant games from Weaviate
-            game_data = await self._gather_game_data(user_data)
-            
-            # Step 3: Analyze user profile
-            user_analysis = await self._analyze_user_profile(user_data)
+            # Steps 2 and 3: Get relevant games from Weaviate (each distinct query runs once
+            # per batch) while analyzing the user profile; neither depends on the other
+            game_data, user_analysis = await asyncio.gather(
+                self._gather_game_data(user_data, shared_searches),
+                self._analyze_user_profile(user_data, cpu_offload)
+            )
             if not user_analysis:
                 return {"error": "Failed to analyze user profile"}
             
             # Step 4: Match games to user
-            game_matches = await self._match_games_to_user(user_analysis, game_data)
+            game_matches = await self._match_games_to_user(user_analysis, game_data, cpu_offload)
             if not game_matches:
                 return {"error": "Failed to match games to user"}
             
             # Step 5: Generate conversation insights
-            conversation_insights = await self._generate_conversation_insights(user_analysis, game_matches)
+            conversation_insights = await self._generate_conversation_insights(
+                user_analysis, game_matches, cpu_offload
+            )
             if not conversation_insights:
                 return {"error": "Failed to generate conversation insights"}
             
@@ -110,21 +202,51 @@ class AgentOrchestrator:
             logger.error(error_msg)
             return {"error": error_msg}
     
+    async def _gather_user_data_batch(self, user_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Gather comprehensive user data for several users with a single Neo4j query.
+        
+        Falls back to per-user reads if the batched query fails.
+        
+        Args:
+            user_ids: User identifiers to look up
+            
+        Returns:
+            User data per input ID, or None for users without a profile
+        """
+        try:
+            bundles = await self.neo4j_client.get_user_bundle_batch(
+                user_ids, history_limit=20, similar_limit=5
+            )
+        except Exception as e:
+            logger.error(f"Batched user data query failed, falling back to per-user reads: {e}")
+            return await asyncio.gather(*(self._gather_user_data(user_id) for user_id in user_ids))
+        
+        user_data_list = []
+        for user_id in user_ids:
+            user_data = bundles.get(user_id)
+            if user_data is None:
+                logger.warning(f"No profile found for user {user_id}")
+            user_data_list.append(user_data)
+        return user_data_list
+    
     async def _gather_user_data(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Gather comprehensive user data from Neo4j."""
         try:
-            profile = await self.neo4j_client.get_user_profile(user_id)
+            # The four reads are independent, so overlap them on the driver's pool
+            profile, history, preferences, similar_users = await asyncio.gather(
+                self.neo4j_client.get_user_profile(user_id),
+                self._history_batcher.get(user_id),
+                self.neo4j_client.get_user_preferences(user_id),
+                self.neo4j_client.get_similar_users(user_id, limit=5)
+            )
             if not profile:
                 logger.warning(f"No profile found for user {user_id}")
                 return None
             
-            history = await self.neo4j_client.get_user_game_history(user_id, limit=20)
-            preferences = await self.neo4j_client.get_user_preferences(user_id)
-            similar_users = await self.neo4j_client.get_similar_users(user_id, limit=5)
-            
             return {
                 "profile": profile,
-                "history": history,
+                "history": history or [],
                 "preferences": preferences,
                 "similar_users": similar_users
             }
@@ -133,31 +255,30 @@ class AgentOrchestrator:
             logger.error(f"Error gathering user data for {user_id}: {e}")
             return None
     
-    async def _gather_game_data(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Gather relevant game data from Weaviate based on user preferences."""
-        try:
-            # Build search queries based on user preferences
-            search_queries = []
-            
-            preferences = user_data.get("preferences", {})
-            favorite_teams = preferences.get("favorite_teams", [])
-            favorite_sports = preferences.get("favorite_sports", [])
-            
-            # Search for preferred teams and sports
-            for team in favorite_teams[:3]:  # Limit to top 3 teams
-                search_queries.append(f"games {team}")
-            
-            for sport in favorite_sports[:2]:  # Limit to top 2 sports
-                search_queries.append(f"{sport} games tickets")
+    async def _gather_game_data(self, user_data: Optional[Dict[str, Any]],
+                                shared_searches: Optional[Dict[str, asyncio.Task]] = None) -> List[Dict[str, Any]]:
+        """
+        Gather relevant game data from Weaviate based on user preferences.
+        
+        Args:
+            user_data: Gathered user data
+            shared_searches: Optional query -> search task map shared by a batch of calls
             
-            # Also search for upcoming games
-            search_queries.append("upcoming games schedule")
+        Returns:
+            Up to 10 unique games
+        """
+        if not user_data:
+            return []
+        
+        try:
+            search_queries = self._build_game_queries(user_data)
             
-            # Execute searches
-            all_games = []
-            for query in search_queries:
-                games = await self.weaviate_client.search_games(query, limit=5)
-                all_games.extend(games)
+            # Execute searches concurrently; a failed search only drops its own results
+            results = await asyncio.gather(
+                *(self._search_games(query, shared_searches) for query in search_queries),
+                return_exceptions=True
+            )
+            all_games = [game for games in results if not isinstance(games, BaseException) for game in games]
             
             # Remove duplicates and return
             unique_games = {game["id"]: game for game in all_games}
@@ -167,63 +288,125 @@ class AgentOrchestrator:
             logger.error(f"Error gathering game data: {e}")
             return []
     
-    async def _analyze_user_profile(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _build_game_queries(self, user_data: Dict[str, Any]) -> List[str]:
+        """Build Weaviate search queries based on user preferences."""
+        search_queries = []
+        
+        preferences = user_data.get("preferences", {})
+        favorite_teams = preferences.get("favorite_teams", [])
+        favorite_sports = preferences.get("favorite_sports", [])
+        
+        # Search for preferred teams and sports
+        for team in favorite_teams[:3]:  # Limit to top 3 teams
+            search_queries.append(f"games {team}")
+        
+        for sport in favorite_sports[:2]:  # Limit to top 2 sports
+            search_queries.append(f"{sport} games tickets")
+        
+        # Also search for upcoming games
+        search_queries.append("upcoming games schedule")
+        
+        # Repeated teams or sports would otherwise issue the same search twice
+        return list(dict.fromkeys(search_queries))
+    
+    async def _search_games(self, query: str,
+                            shared_searches: Optional[Dict[str, asyncio.Task]] = None) -> List[Dict[str, Any]]:
+        """Search Weaviate, reusing an in-flight search for the same query within a batch."""
+        if shared_searches is None:
+            return await self._cached_search(query)
+        
+        return await self._start_search(query, shared_searches)
+    
+    def _start_search(self, query: str, shared_searches: Dict[str, asyncio.Task]) -> asyncio.Task:
+        """Start a Weaviate search unless one for the same query is already in flight."""
+        search = shared_searches.get(query)
+        if search is None:
+            search = asyncio.ensure_future(self._cached_search(query))
+            shared_searches[query] = search
+        return search
+    
+    async def _cached_search(self, query: str) -> List[Dict[str, Any]]:
+        """Search Weaviate, reusing results for the same query from the last SEARCH_CACHE_TTL seconds."""
+        games = self._search_cache.get(query)
+        if games is not None:
+            return games
+        
+        games = await self.weaviate_client.search_games(query, limit=GAME_SEARCH_LIMIT)
+        
+        # search_games returns [] on errors, so only non-empty results are kept
+        if games:
+            self._search_cache.set(query, games)
+        return games
+    
+    def _update_query_hints(self, calls: List[Tuple[str, str]],
+                            user_data_list: List[Optional[Dict[str, Any]]],
+                            shared_searches: Dict[str, asyncio.Task]):
+        """Remember each user's queries for prefetching and cancel unused speculative searches."""
+        used_queries = set()
+        for (user_id, _), user_data in zip(calls, user_data_list):
+            if not user_data:
+                continue
+            queries = tuple(self._build_game_queries(user_data))
+            used_queries.update(queries)
+            
+            self._query_hints[user_id] = queries
+            self._query_hints.move_to_end(user_id)
+            if len(self._query_hints) > self._query_hints_maxsize:
+                self._query_hints.popitem(last=False)
+        
+        for query, search in shared_searches.items():
+            if query not in used_queries and not search.done():
+                search.cancel()
+    
+    async def _analyze_user_profile(self, user_data: Dict[str, Any],
+                                    cpu_offload: bool = False) -> Optional[Dict[str, Any]]:
         """Analyze user profile using the data analyst agent."""
-        try:
-            task = AgentTask(
-                id=f"analyze_profile_{asyncio.get_event_loop().time()}",
-                type="analyze_user_profile",
-                data={"user_data": user_data}
-            )
-            
-            result = await self.data_analyst.execute_task(task)
-            
-            if result.status == AgentStatus.COMPLETED:
-                return result.data
-            else:
-                logger.error(f"User analysis failed: {result.error}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error analyzing user profile: {e}")
-            return None
+        return await self._run_analyst_task(
+            "analyze_profile", "analyze_user_profile", {"user_data": user_data},
+            cpu_offload, "User analysis"
+        )
     
     async def _match_games_to_user(self, user_analysis: Dict[str, Any], 
-                                 game_data: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+                                 game_data: List[Dict[str, Any]],
+                                 cpu_offload: bool = False) -> Optional[Dict[str, Any]]:
         """Match games to user using the data analyst agent."""
-        try:
-            task = AgentTask(
-                id=f"match_games_{asyncio.get_event_loop().time()}",
-                type="match_games_to_user",
-                data={
-                    "user_analysis": user_analysis,
-                    "available_games": game_data
-                }
-            )
-            
-            result = await self.data_analyst.execute_task(task)
-            
-            if result.status == AgentStatus.COMPLETED:
-                return result.data
-            else:
-                logger.error(f"Game matching failed: {result.error}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error matching games to user: {e}")
-            return None
+        return await self._run_analyst_task(
+            "match_games", "match_games_to_user",
+            {"user_analysis": user_analysis, "available_games": game_data},
+            cpu_offload, "Game matching"
+        )
     
     async def _generate_conversation_insights(self, user_analysis: Dict[str, Any], 
-                                            game_matches: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                                            game_matches: Dict[str, Any],
+                                            cpu_offload: bool = False) -> Optional[Dict[str, Any]]:
         """Generate conversation insights using the data analyst agent."""
+        return await self._run_analyst_task(
+            "conversation_insights", "generate_conversation_insights",
+            {"user_analysis": user_analysis, "matched_games": game_matches.get("matched_games", [])},
+            cpu_offload, "Conversation insights generation"
+        )
+    
+    async def _run_analyst_task(self, id_prefix: str, task_type: str, data: Dict[str, Any],
+                                cpu_offload: bool, description: str) -> Optional[Dict[str, Any]]:
+        """
+        Run one task on the data analyst agent.
+        
+        Args:
+            id_prefix: Prefix for the task ID
+            task_type: Analyst task type
+            data: Task input data
+            cpu_offload: Allow the stage to run in the shared process pool
+            description: Stage name used in error logs
+            
+        Returns:
+            Result data, or None if the task failed
+        """
         try:
             task = AgentTask(
-                id=f"conversation_insights_{asyncio.get_event_loop().time()}",
-                type="generate_conversation_insights",
-                data={
-                    "user_analysis": user_analysis,
-                    "matched_games": game_matches.get("matched_games", [])
-                }
+                id=f"{id_prefix}_{next(self._task_ids)}",
+                type=task_type,
+                data=data,
+                cpu_offload=cpu_offload
             )
             
             result = await self.data_analyst.execute_task(task)
@@ -231,11 +414,11 @@ class AgentOrchestrator:
             if result.status == AgentStatus.COMPLETED:
                 return result.data
             else:
-                logger.error(f"Conversation insights generation failed: {result.error}")
+                logger.error(f"{description} failed: {result.error}")
                 return None
                 
         except Exception as e:
-            logger.error(f"Error generating conversation insights: {e}")
+            logger.error(f"Error in {description.lower()}: {e}")
             return None
     
     async def _make_sales_call(self, user_id: str, phone_number: str, 
@@ -243,13 +426,13 @@ class AgentOrchestrator:
         """Make the actual sales call using VAPI."""
         try:
             # Create context for the AI assistant
-            context = await self.vapi_client.create_call_context(
+            context = self.vapi_client.create_call_context(
                 user_data=call_context["user_data"],
-                game_data=call_context["game_matches"].get("matched_games", [])
+                game_data=[match.game for match in call_context["game_matches"].get("matched_games", [])]
             )
             
             # Create assistant configuration
-            assistant_config = await self.vapi_client.create_assistant(context)
+            assistant_config = self.vapi_client.create_assistant(context)
             
             # Make the call
             call_result = await self.vapi_client.make_call(
@@ -276,7 +459,7 @@ class AgentOrchestrator:
                 "games_promoted": call_result.get("games_promoted", 0),
                 "user_segment": call_result.get("user_segment"),
                 "context_size": call_result.get("context_used", 0),
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": time.time()
             }
             
             await self.neo4j_client.record_interaction(
@@ -300,14 +483,13 @@ class AgentOrchestrator:
         """
         logger.info(f"Processing batch of {len(user_list)} sales calls")
         
-        # Create tasks for all calls
-        tasks = []
-        for user in user_list:
-            task = self.process_sales_call(user["user_id"], user["phone_number"])
-            tasks.append(task)
-        
-        # Execute all calls concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Run the whole list as one batch: one Neo4j bundle query, one search per
+        # distinct Weaviate query, and analysis fanned out to the process pool
+        calls = [(user["user_id"], user["phone_number"]) for user in user_list]
+        try:
+            results = await self.process_sales_calls(calls)
+        except Exception as e:
+            results = [e] * len(calls)
         
         # Process results
         successful_calls = []
@@ -339,27 +521,76 @@ class AgentOrchestrator:
             }
         }
     
+    async def schedule_call(self, user_id: str, phone_number: str):
+        """
+        Queue a sales call for the run loop, waiting if the queue is full.
+        
+        Args:
+            user_id: Target user identifier
+            phone_number: User's phone number
+        """
+        await self._call_queue.put((user_id, phone_number))
+    
     async def run(self):
         """Main run loop for the orchestrator."""
         logger.info("Starting Agent Orchestrator main loop...")
         
-        # This would typically run continuously, processing calls from a queue
-        # For now, it's a placeholder for the main execution logic
-        
         try:
             while True:
-                # Check for new call requests
-                # Process queued calls
-                # Monitor active calls
-                # Handle completions and failures
+                user_id, phone_number = await self._call_queue.get()
                 
-                await asyncio.sleep(10)  # Check every 10 seconds
+                # Wait for a free slot so at most MAX_CONCURRENT_CALLS run at once
+                await self._call_slots.acquire()
+                task = asyncio.create_task(self._run_scheduled_call(user_id, phone_number))
+                self.active_tasks[task] = user_id
+                task.add_done_callback(self._on_scheduled_call_done)
                 
         except KeyboardInterrupt:
             logger.info("Shutting down orchestrator...")
         except Exception as e:
             logger.error(f"Error in orchestrator main loop: {e}")
     
+    async def _run_scheduled_call(self, user_id: str, phone_number: str) -> Dict[str, Any]:
+        """Process one queued call and log its outcome."""
+        try:
+            result = await self.process_sales_call(user_id, phone_number)
+            if not result.get("success"):
+                logger.error(f"Scheduled call for user {user_id} failed: {result.get('error')}")
+            return result
+        finally:
+            self._call_queue.task_done()
+    
+    def _on_scheduled_call_done(self, task: asyncio.Task):
+        """Release the call's slot and stop tracking it."""
+        self._call_slots.release()
+        user_id = self.active_tasks.pop(task, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Scheduled call for user {user_id} raised: {task.exception()}")
+    
+    async def probe_connections(self, timeout: float = 2.0) -> Dict[str, bool]:
+        """
+        Ping Weaviate, Neo4j and VAPI concurrently.
+        
+        Args:
+            timeout: Maximum seconds to wait for each probe
+            
+        Returns:
+            Mapping of service name to reachability; timeouts and errors count as unreachable
+        """
+        services = {
+            "weaviate": self.weaviate_client,
+            "neo4j": self.neo4j_client,
+            "vapi": self.vapi_client
+        }
+        results = await asyncio.gather(
+            *(asyncio.wait_for(client.ping(), timeout) for client in services.values()),
+            return_exceptions=True
+        )
+        return {
+            name: result is True
+            for name, result in zip(services, results)
+        }
+    
     def get_system_status(self) -> Dict[str, Any]:
         """Get overall system status."""
         return {
@@ -0,0 +1,94 @@
+"""
+Agent Result Store
+==================
+
+SQLite-backed store for agent result payloads that are too large to keep in memory.
+The database file lives in a private per-user cache directory and is shared by that
+user's agent and worker processes.
+"""
+
+import os
+import logging
+import sqlite3
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_STORE_PATH = os.getenv("AGENT_RESULT_STORE_PATH") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "hackerday-sf", "agent_results.sqlite3"
+)
+
+
+class ResultStore:
+    """Key/value store for serialized agent result payloads."""
+
+    def __init__(self, path: str = DEFAULT_RESULT_STORE_PATH):
+        """
+        Initialize the result store.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            # Owner-only access: other users must not be able to read or plant payloads
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            os.chmod(self.path, 0o600)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "agent_id TEXT NOT NULL, key TEXT NOT NULL, payload BLOB NOT NULL, "
+                "PRIMARY KEY (agent_id, key))"
+            )
+            logger.info("Opened agent result store at %s", self.path)
+        return self._conn
+
+    def _exists(self) -> bool:
+        """Check whether the store has been opened here or created by another process."""
+        return self._conn is not None or os.path.exists(self.path)
+
+    def put(self, agent_id: str, key: str, payload: bytes):
+        """Store a payload, replacing any previous value for the key."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (agent_id, key, payload) VALUES (?, ?, ?)",
+                (agent_id, key, payload)
+            )
+            conn.commit()
+
+    def get(self, agent_id: str, key: str) -> Optional[bytes]:
+        """Get a stored payload, or None if it is missing."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload FROM results WHERE agent_id = ? AND key = ?",
+                (agent_id, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, agent_id: str, key: str):
+        """Remove a stored payload if present."""
+        if not self._exists():
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM results WHERE agent_id = ? AND key = ?", (agent_id, key))
+            conn.commit()
+
+    def clear(self, agent_id: str):
+        """Remove all payloads stored by an agent."""
+        if not self._exists():
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM results WHERE agent_id = ?", (agent_id,))
+            conn.commit()
@@ -6,43 +6,301 @@ Handles all interactions with Neo4j graph database for user information and game
 """
 
 import os
+import itertools
 import logging
 from typing import List, Dict, Any, Optional
-from neo4j import GraphDatabase, basic_auth
+from neo4j import AsyncGraphDatabase, AsyncResult, RoutingControl, basic_auth
+from src.utils.batching import MicroBatcher
+from src.utils.config import neo4j_pool_size
+from src.utils.serialization import dumps_str
+from src.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 
+# Connection pool settings for the shared Bolt driver; the pool size comes from config.
+# A short acquisition timeout makes bursts fail fast instead of queueing behind a full pool.
+CONNECTION_ACQUISITION_TIMEOUT = 5.0  # seconds
+MAX_CONNECTION_LIFETIME = 1800  # seconds
+
+# Interaction writes are grouped into one UNWIND statement per batch
+INTERACTION_BATCH_SIZE = 100
+INTERACTION_BATCH_DELAY = 0.05  # seconds
+
+# Profiles and preferences rarely change during a session, so reads are cached briefly
+USER_CACHE_MAXSIZE = 10000
+USER_CACHE_TTL = 300  # seconds
+
+# Complete sets of attended game IDs, reused by get_similar_users
+USER_GAMES_CACHE_MAXSIZE = 10000
+USER_GAMES_CACHE_TTL = 300  # seconds
+
+# Idempotent schema so {id: ...} and {name: ...} lookups use index seeks instead of label scans
+SCHEMA_QUERIES = [
+    "CREATE CONSTRAINT user_id IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+    "CREATE CONSTRAINT game_id IF NOT EXISTS FOR (g:Game) REQUIRE g.id IS UNIQUE",
+    "CREATE CONSTRAINT sport_name IF NOT EXISTS FOR (s:Sport) REQUIRE s.name IS UNIQUE",
+    "CREATE CONSTRAINT team_name IF NOT EXISTS FOR (t:Team) REQUIRE t.name IS UNIQUE",
+    "CREATE INDEX game_date IF NOT EXISTS FOR (g:Game) ON (g.date)",
+]
+
+# Cypher is kept in module constants so every call sends the identical, parameterized
+# statement text and the server reuses its cached query plan
+USER_PROFILE_QUERY = """
+MATCH (u:User {id: $user_id})
+RETURN u.id as id, u.name as name, u.email as email,
+       u.phone as phone, u.preferences as preferences,
+       u.created_at as created_at
+"""
+
+USER_GAME_HISTORY_QUERY = """
+MATCH (u:User {id: $user_id})-[a:ATTENDED]->(g:Game)
+RETURN g.id as game_id, g.title as game_title,
+       g.date as game_date, g.venue as venue,
+       a.ticket_type as ticket_type, a.satisfaction_rating as rating,
+       a.attended_date as attended_date
+ORDER BY a.attended_date DESC
+LIMIT $limit
+"""
+
+USER_HISTORIES_QUERY = """
+UNWIND $user_ids AS user_id
+MATCH (u:User {id: user_id})-[a:ATTENDED]->(g:Game)
+WITH user_id, a, g
+ORDER BY a.attended_date DESC
+WITH user_id, collect({
+    game_id: g.id, game_title: g.title,
+    game_date: g.date, venue: g.venue,
+    ticket_type: a.ticket_type, rating: a.satisfaction_rating,
+    attended_date: a.attended_date
+})[..$limit] AS history
+RETURN user_id, history
+"""
+
+USER_BUNDLE_QUERY = """
+UNWIND $user_ids AS user_id
+MATCH (u:User {id: user_id})
+CALL {
+    WITH u
+    MATCH (u)-[a:ATTENDED]->(g:Game)
+    WITH a, g
+    ORDER BY a.attended_date DESC
+    RETURN collect({
+        game_id: g.id, game_title: g.title,
+        game_date: g.date, venue: g.venue,
+        ticket_type: a.ticket_type, rating: a.satisfaction_rating,
+        attended_date: a.attended_date
+    })[..$history_limit] AS history
+}
+CALL {
+    WITH u
+    MATCH (u)-[:ATTENDED]->(g:Game)<-[:ATTENDED]-(u2:User)
+    WHERE u <> u2
+    WITH u2, count(DISTINCT g) AS common_games
+    CALL {
+        WITH u2
+        MATCH (u2)-[:ATTENDED]->(g2:Game)
+        RETURN count(g2) AS total_games
+    }
+    WITH u2, common_games, total_games,
+         (common_games * 1.0 / total_games) AS similarity_score
+    ORDER BY similarity_score DESC
+    LIMIT $similar_limit
+    RETURN collect({
+        user_id: u2.id, name: u2.name,
+        common_games: common_games, total_games: total_games,
+        similarity_score: similarity_score
+    }) AS similar_users
+}
+RETURN user_id,
+       u {.id, .name, .email, .phone, .preferences, .created_at} AS profile,
+       history,
+       {
+           general_preferences: u.preferences,
+           favorite_teams: [(u)-[:INTERESTED_IN]->(t:Team) | t.name],
+           favorite_sports: [(u)-[:PREFERS]->(s:Sport) | s.name]
+       } AS preferences,
+       similar_users
+"""
+
+USER_PREFERENCES_QUERY = """
+MATCH (u:User {id: $user_id})
+RETURN u.preferences as general_preferences,
+       [(u)-[:INTERESTED_IN]->(t:Team) | t.name] as favorite_teams,
+       [(u)-[:PREFERS]->(s:Sport) | s.name] as favorite_sports
+"""
+
+SIMILAR_USERS_BY_GAMES_QUERY = """
+MATCH (g:Game)<-[:ATTENDED]-(u2:User)
+WHERE g.id IN $game_ids AND u2.id <> $user_id
+WITH u2, count(DISTINCT g) as common_games
+CALL {
+    WITH u2
+    MATCH (u2)-[:ATTENDED]->(g2:Game)
+    RETURN count(g2) as total_games
+}
+RETURN u2.id as user_id, u2.name as name,
+       common_games, total_games,
+       (common_games * 1.0 / total_games) as similarity_score
+ORDER BY similarity_score DESC
+LIMIT $limit
+"""
+
+SIMILAR_USERS_QUERY = """
+MATCH (u1:User {id: $user_id})-[:ATTENDED]->(g:Game)<-[:ATTENDED]-(u2:User)
+WHERE u1 <> u2
+WITH u2, count(DISTINCT g) as common_games
+CALL {
+    WITH u2
+    MATCH (u2)-[:ATTENDED]->(g2:Game)
+    RETURN count(g2) as total_games
+}
+RETURN u2.id as user_id, u2.name as name,
+       common_games, total_games,
+       (common_games * 1.0 / total_games) as similarity_score
+ORDER BY similarity_score DESC
+LIMIT $limit
+"""
+
+WRITE_INTERACTIONS_QUERY = """
+UNWIND $rows AS row
+MATCH (u:User {id: row.user_id})
+CREATE (i:Interaction {
+    type: row.type,
+    timestamp: datetime(),
+    details: row.details
+})
+CREATE (u)-[:HAD_INTERACTION]->(i)
+"""
+
+
 class Neo4jClient:
     """Client for interacting with Neo4j graph database."""
     
-    def __init__(self):
-        """Initialize Neo4j client."""
-        self.driver = None
-        self._connect()
+    def __init__(self, driver=None, config=None):
+        """
+        Initialize Neo4j client.
+        
+        Args:
+            driver: Optional pre-built Neo4j driver to reuse instead of opening a new one
+            config: Optional DatabaseConfig; connection settings are read from the environment if omitted
+        """
+        self.driver = driver
+        self.config = config
+        # Naming the database skips the home-database lookup on every session
+        if config is not None:
+            self.database = config.neo4j_database
+        else:
+            self.database = os.getenv("NEO4J_DATABASE", "neo4j")
+        
+        # Cached profile and preference reads, keyed by (method, user_id)
+        self._user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL)
+        
+        # Attended game IDs per user, only stored when a history read returned every game
+        self._user_games = TTLCache(maxsize=USER_GAMES_CACHE_MAXSIZE, ttl=USER_GAMES_CACHE_TTL)
+        
+        # Keys are (sequence, user_id, type, details_json) so identical interactions stay distinct
+        self._interaction_seq = itertools.count()
+        self._interaction_batcher = MicroBatcher(
+            self._write_interactions,
+            max_size=INTERACTION_BATCH_SIZE,
+            max_delay=INTERACTION_BATCH_DELAY
+        )
+        
+        if self.driver is None:
+            self._connect()
+    
+    @classmethod
+    async def create(cls, config=None) -> "Neo4jClient":
+        """
+        Create a client and verify that Neo4j is reachable.
+        
+        Args:
+            config: Optional DatabaseConfig with connection settings
+            
+        Returns:
+            Connected Neo4j client
+        """
+        client = cls(config=config)
+        try:
+            await client.verify_connectivity()
+        except Exception:
+            await client.close()
+            raise
+        
+        try:
+            await client.ensure_schema()
+        except Exception as e:
+            # Read-only users cannot create schema; queries still work, just without index seeks
+            logger.warning(f"Could not ensure Neo4j schema: {e}")
+        return client
     
     def _connect(self):
-        """Connect to Neo4j instance."""
+        """Create the async Neo4j driver."""
         try:
-            uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-            username = os.getenv("NEO4J_USERNAME", "neo4j")
-            password = os.getenv("NEO4J_PASSWORD")
+            if self.config is not None:
+                uri = self.config.neo4j_uri
+                username = self.config.neo4j_username
+                password = self.config.neo4j_password
+                max_pool = self.config.neo4j_max_pool
+            else:
+                uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+                username = os.getenv("NEO4J_USERNAME", "neo4j")
+                password = os.getenv("NEO4J_PASSWORD")
+                max_pool = neo4j_pool_size()
             
-            self.driver = GraphDatabase.driver(
+            self.driver = AsyncGraphDatabase.driver(
                 uri,
-                auth=basic_auth(username, password)
+                auth=basic_auth(username, password),
+                max_connection_pool_size=max_pool,
+                connection_acquisition_timeout=CONNECTION_ACQUISITION_TIMEOUT,
+                max_connection_lifetime=MAX_CONNECTION_LIFETIME
             )
             
-            # Test connection
-            with self.driver.session() as session:
-                session.run("RETURN 1")
-            
+        except Exception as e:
+            logger.error(f"Failed to create Neo4j driver: {e}")
+            raise
+    
+    def session(self):
+        """Open a session on the configured database."""
+        return self.driver.session(database=self.database)
+    
+    async def verify_connectivity(self):
+        """Verify that the Neo4j instance is reachable."""
+        try:
+            await self.driver.verify_connectivity()
             logger.info("Connected to Neo4j successfully")
             
         except Exception as e:
             logger.error(f"Failed to connect to Neo4j: {e}")
             raise
     
+    async def ensure_schema(self):
+        """Create the constraints and indexes the client's queries rely on, if missing."""
+        # Schema statements cannot share a transaction, so each runs on its own
+        for query in SCHEMA_QUERIES:
+            await self.driver.execute_query(
+                query,
+                database_=self.database,
+                routing_=RoutingControl.WRITE,
+                result_transformer_=AsyncResult.consume
+            )
+        logger.info("Neo4j schema is up to date")
+    
+    async def ping(self) -> bool:
+        """
+        Check whether Neo4j is reachable.
+        
+        Returns:
+            True if the instance is reachable, False otherwise
+        """
+        try:
+            await self.driver.verify_connectivity()
+            return True
+        except Exception as e:
+            logger.warning(f"Neo4j ping failed: {e}")
+            return False
+    
     async def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve user profile information.
@@ -53,23 +311,25 @@ class Neo4jClient:
         Returns:
             User profile dictionary or None if not found
         """
+        cached = self._user_cache.get(("profile", user_id))
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (u:User {id: $user_id})
-                    RETURN u.id as id, u.name as name, u.email as email,
-                           u.phone as phone, u.preferences as preferences,
-                           u.created_at as created_at
-                    """,
-                    user_id=user_id
-                )
-                
-                record = result.single()
-                if record:
-                    return dict(record)
-                return None
-                
+            record = await self.driver.execute_query(
+                USER_PROFILE_QUERY,
+                user_id=user_id,
+                database_=self.database,
+                routing_=RoutingControl.READ,
+                result_transformer_=AsyncResult.single
+            )
+            
+            if record:
+                profile = record.data()
+                self._user_cache.set(("profile", user_id), profile)
+                return dict(profile)
+            return None
+            
         except Exception as e:
             logger.error(f"Error retrieving user profile {user_id}: {e}")
             return None
@@ -86,27 +346,122 @@ class Neo4jClient:
             List of game attendance records
         """
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (u:User {id: $user_id})-[a:ATTENDED]->(g:Game)
-                    RETURN g.id as game_id, g.title as game_title, 
-                           g.date as game_date, g.venue as venue,
-                           a.ticket_type as ticket_type, a.satisfaction_rating as rating,
-                           a.attended_date as attended_date
-                    ORDER BY a.attended_date DESC
-                    LIMIT $limit
-                    """,
-                    user_id=user_id,
-                    limit=limit
-                )
-                
-                return [dict(record) for record in result]
-                
+            history = await self.driver.execute_query(
+                USER_GAME_HISTORY_QUERY,
+                user_id=user_id,
+                limit=limit,
+                database_=self.database,
+                routing_=RoutingControl.READ,
+                result_transformer_=AsyncResult.data
+            )
+            
+            self._remember_user_games(user_id, history, limit)
+            return history
+            
         except Exception as e:
             logger.error(f"Error retrieving game history for user {user_id}: {e}")
             return []
     
+    async def fetch_user_histories(self, user_ids: List[str], limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get game attendance history for several users in a single query.
+        
+        Args:
+            user_ids: User identifiers to look up
+            limit: Maximum number of records to return per user
+            
+        Returns:
+            Dictionary mapping each user ID to its game attendance records
+        """
+        histories = {user_id: [] for user_id in user_ids}
+        if not user_ids:
+            return histories
+        
+        try:
+            records = await self.driver.execute_query(
+                USER_HISTORIES_QUERY,
+                user_ids=list(user_ids),
+                limit=limit,
+                database_=self.database,
+                routing_=RoutingControl.READ,
+                result_transformer_=AsyncResult.data
+            )
+            
+            for record in records:
+                histories[record["user_id"]] = record["history"]
+            
+            for user_id, history in histories.items():
+                self._remember_user_games(user_id, history, limit)
+            return histories
+            
+        except Exception as e:
+            logger.error(f"Error retrieving game histories for {len(user_ids)} users: {e}")
+            return histories
+    
+    async def get_user_bundle_batch(self, user_ids: List[str], history_limit: int = 20,
+                                    similar_limit: int = 5) -> Dict[str, Dict[str, Any]]:
+        """
+        Get profile, history, preferences and similar users for several users in one query.
+        
+        Args:
+            user_ids: User identifiers to look up
+            history_limit: Maximum number of history records per user
+            similar_limit: Maximum number of similar users per user
+            
+        Returns:
+            Dictionary mapping each found user ID to a dict with "profile", "history",
+            "preferences" and "similar_users" in the same shapes as the single-user methods
+            
+        Raises:
+            Exception: If the query fails, so callers can fall back to per-user reads
+        """
+        if not user_ids:
+            return {}
+        
+        records = await self.driver.execute_query(
+            USER_BUNDLE_QUERY,
+            user_ids=list(user_ids),
+            history_limit=history_limit,
+            similar_limit=similar_limit,
+            database_=self.database,
+            routing_=RoutingControl.READ,
+            result_transformer_=AsyncResult.data
+        )
+        
+        return {
+            record["user_id"]: {
+                "profile": record["profile"],
+                "history": record["history"],
+                "preferences": record["preferences"],
+                "similar_users": record["similar_users"]
+            }
+            for record in records
+        }
+    
+    async def get_user_context(self, user_id: str, history_limit: int = 10,
+                               similar_limit: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Get a user's profile, history, preferences and similar users in one round trip.
+        
+        Args:
+            user_id: Unique user identifier
+            history_limit: Maximum number of history records
+            similar_limit: Maximum number of similar users
+            
+        Returns:
+            Dictionary with "profile", "history", "preferences" and "similar_users",
+            or None if the user was not found
+        """
+        try:
+            bundles = await self.get_user_bundle_batch(
+                [user_id], history_limit=history_limit, similar_limit=similar_limit
+            )
+            return bundles.get(user_id)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving context for user {user_id}: {e}")
+            return None
+    
     async def get_user_preferences(self, user_id: str) -> Dict[str, Any]:
         """
         Get user's preferences and interests.
@@ -117,25 +472,25 @@ class Neo4jClient:
         Returns:
             Dictionary of user preferences
         """
+        cached = self._user_cache.get(("preferences", user_id))
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (u:User {id: $user_id})
-                    OPTIONAL MATCH (u)-[i:INTERESTED_IN]->(t:Team)
-                    OPTIONAL MATCH (u)-[p:PREFERS]->(s:Sport)
-                    RETURN u.preferences as general_preferences,
-                           collect(DISTINCT t.name) as favorite_teams,
-                           collect(DISTINCT s.name) as favorite_sports
-                    """,
-                    user_id=user_id
-                )
-                
-                record = result.single()
-                if record:
-                    return dict(record)
-                return {}
-                
+            record = await self.driver.execute_query(
+                USER_PREFERENCES_QUERY,
+                user_id=user_id,
+                database_=self.database,
+                routing_=RoutingControl.READ,
+                result_transformer_=AsyncResult.single
+            )
+            
+            if record:
+                preferences = record.data()
+                self._user_cache.set(("preferences", user_id), preferences)
+                return dict(preferences)
+            return {}
+            
         except Exception as e:
             logger.error(f"Error retrieving preferences for user {user_id}: {e}")
             return {}
@@ -151,27 +506,32 @@ class Neo4jClient:
         Returns:
             List of similar users with similarity scores
         """
+        game_ids = self._user_games.get(user_id)
+        if game_ids is not None and not game_ids:
+            return []
+        
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (u1:User {id: $user_id})-[:ATTENDED]->(g:Game)<-[:ATTENDED]-(u2:User)
-                    WHERE u1 <> u2
-                    WITH u2, count(g) as common_games
-                    MATCH (u2)-[:ATTENDED]->(g2:Game)
-                    WITH u2, common_games, count(g2) as total_games
-                    RETURN u2.id as user_id, u2.name as name,
-                           common_games, total_games,
-                           (common_games * 1.0 / total_games) as similarity_score
-                    ORDER BY similarity_score DESC
-                    LIMIT $limit
-                    """,
+            if game_ids is not None:
+                # The user's games are known, so start from them and skip the first hop
+                return await self.driver.execute_query(
+                    SIMILAR_USERS_BY_GAMES_QUERY,
+                    game_ids=list(game_ids),
                     user_id=user_id,
-                    limit=limit
+                    limit=limit,
+                    database_=self.database,
+                    routing_=RoutingControl.READ,
+                    result_transformer_=AsyncResult.data
                 )
-                
-                return [dict(record) for record in result]
-                
+            
+            return await self.driver.execute_query(
+                SIMILAR_USERS_QUERY,
+                user_id=user_id,
+                limit=limit,
+                database_=self.database,
+                routing_=RoutingControl.READ,
+                result_transformer_=AsyncResult.data
+            )
+            
         except Exception as e:
             logger.error(f"Error finding similar users for {user_id}: {e}")
             return []
@@ -181,40 +541,63 @@ class Neo4jClient:
         """
         Record a user interaction (call, purchase, etc.).
         
+        Concurrent interactions are written together, up to 100 per statement or every 50 ms.
+        
         Args:
             user_id: Unique user identifier
             interaction_type: Type of interaction (call, purchase, etc.)
-            details: Additional interaction details
+            details: Additional interaction details, stored as a JSON string
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            with self.driver.session() as session:
-                session.run(
-                    """
-                    MATCH (u:User {id: $user_id})
-                    CREATE (i:Interaction {
-                        type: $interaction_type,
-                        timestamp: datetime(),
-                        details: $details
-                    })
-                    CREATE (u)-[:HAD_INTERACTION]->(i)
-                    """,
-                    user_id=user_id,
-                    interaction_type=interaction_type,
-                    details=details
-                )
-                
-                logger.info(f"Recorded {interaction_type} interaction for user {user_id}")
-                return True
-                
+            # Node properties cannot hold maps, so encode the details once up front
+            details_json = dumps_str(details)
+            
+            await self._interaction_batcher.get(
+                (next(self._interaction_seq), user_id, interaction_type, details_json)
+            )
+            self.invalidate_user(user_id)
+            
+            logger.info(f"Recorded {interaction_type} interaction for user {user_id}")
+            return True
+            
         except Exception as e:
             logger.error(f"Error recording interaction for user {user_id}: {e}")
             return False
     
-    def close(self):
-        """Close the Neo4j connection."""
+    def _remember_user_games(self, user_id: str, history: List[Dict[str, Any]], limit: int):
+        """Cache a user's attended game IDs if the history read was not truncated."""
+        if len(history) < limit:
+            self._user_games.set(
+                user_id,
+                frozenset(game["game_id"] for game in history if game.get("game_id") is not None)
+            )
+    
+    def invalidate_user(self, user_id: str):
+        """Drop cached profile and preference reads for a user."""
+        self._user_cache.pop(("profile", user_id))
+        self._user_cache.pop(("preferences", user_id))
+    
+    async def _write_interactions(self, keys: List[tuple]) -> Dict[tuple, bool]:
+        """Write a batch of queued interactions in a single statement."""
+        rows = [
+            {"user_id": user_id, "type": interaction_type, "details": details_json}
+            for _, user_id, interaction_type, details_json in keys
+        ]
+        await self.driver.execute_query(
+            WRITE_INTERACTIONS_QUERY,
+            rows=rows,
+            database_=self.database,
+            routing_=RoutingControl.WRITE,
+            result_transformer_=AsyncResult.consume
+        )
+        return {key: True for key in keys}
+    
+    async def close(self):
+        """Close the Neo4j connection, writing any queued interactions first."""
         if self.driver:
-            self.driver.close()
+            await self._interaction_batcher.flush()
+            await self.driver.close()
             logger.info("Neo4j connection closed")
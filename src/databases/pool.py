@@ -0,0 +1,65 @@
+"""
+Shared Database Clients
+=======================
+
+Lazily creates one long-lived Weaviate client and one Neo4j client per process
+so that every caller reuses the same connection pools.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Tuple
+from src.databases.weaviate_client import WeaviateClient
+from src.databases.neo4j_client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+_clients: Optional[Tuple[WeaviateClient, Neo4jClient]] = None
+_lock = asyncio.Lock()
+
+
+async def get_clients(config=None) -> Tuple[WeaviateClient, Neo4jClient]:
+    """
+    Get the shared database clients, creating them on first use.
+
+    Args:
+        config: Optional DatabaseConfig used when the clients are first created
+
+    Returns:
+        Tuple of (weaviate_client, neo4j_client)
+    """
+    global _clients
+
+    async with _lock:
+        if _clients is None:
+            # Connect to both databases concurrently so startup pays only the slower handshake
+            weaviate_client, neo4j_client = await asyncio.gather(
+                WeaviateClient.create(config),
+                Neo4jClient.create(config),
+                return_exceptions=True
+            )
+
+            errors = [c for c in (weaviate_client, neo4j_client) if isinstance(c, BaseException)]
+            if errors:
+                if isinstance(weaviate_client, WeaviateClient):
+                    weaviate_client.close()
+                if isinstance(neo4j_client, Neo4jClient):
+                    await neo4j_client.close()
+                raise errors[0]
+
+            _clients = (weaviate_client, neo4j_client)
+            logger.info("Created shared database clients")
+
+    return _clients
+
+
+async def close_clients():
+    """Close the shared database clients if they were created."""
+    global _clients
+
+    async with _lock:
+        if _clients is not None:
+            weaviate_client, neo4j_client = _clients
+            weaviate_client.close()
+            await neo4j_client.close()
+            _clients = None
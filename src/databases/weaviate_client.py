@@ -6,28 +6,69 @@ Handles all interactions with Weaviate vector database for game information retr
 """
 
 import os
+import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 import weaviate
-from weaviate.classes.config import Configure
+from weaviate.classes.config import DataType, Property
+from weaviate.classes.query import Filter, MetadataQuery, Sort
 
 logger = logging.getLogger(__name__)
 
+# Games schema; "date" must be a DATE (RFC3339) so get_upcoming_games can range-filter and sort on it
+GAMES_PROPERTIES = [
+    Property(name="title", data_type=DataType.TEXT),
+    Property(name="sport", data_type=DataType.TEXT),
+    Property(name="date", data_type=DataType.DATE, index_filterable=True),
+    Property(name="venue", data_type=DataType.TEXT),
+    Property(name="teams", data_type=DataType.TEXT_ARRAY),
+    Property(name="description", data_type=DataType.TEXT),
+]
+
 
 class WeaviateClient:
     """Client for interacting with Weaviate vector database."""
     
-    def __init__(self):
-        """Initialize Weaviate client."""
-        self.client = None
+    def __init__(self, client=None, config=None):
+        """
+        Initialize Weaviate client.
+        
+        Args:
+            client: Optional pre-built Weaviate client to reuse instead of opening a new one
+            config: Optional DatabaseConfig; connection settings are read from the environment if omitted
+        """
+        self.client = client
+        self.config = config
         self.collection_name = "Games"
-        self._connect()
+        if self.client is None:
+            self._connect()
+        
+        # Resolve the collection handle once instead of on every query
+        self.games = self.client.collections.get(self.collection_name)
+    
+    @classmethod
+    async def create(cls, config=None) -> "WeaviateClient":
+        """
+        Create a connected client without blocking the event loop.
+        
+        Args:
+            config: Optional DatabaseConfig with connection settings
+            
+        Returns:
+            Connected Weaviate client
+        """
+        return await asyncio.to_thread(cls, config=config)
     
     def _connect(self):
         """Connect to Weaviate instance."""
         try:
-            weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-            api_key = os.getenv("WEAVIATE_API_KEY")
+            if self.config is not None:
+                weaviate_url = self.config.weaviate_url
+                api_key = self.config.weaviate_api_key
+            else:
+                weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
+                api_key = os.getenv("WEAVIATE_API_KEY")
             
             if api_key:
                 self.client = weaviate.connect_to_custom(
@@ -45,6 +86,29 @@ class WeaviateClient:
             logger.error(f"Failed to connect to Weaviate: {e}")
             raise
     
+    async def ensure_schema(self):
+        """Create the Games collection with the properties the client's queries rely on, if missing."""
+        def _ensure():
+            if not self.client.collections.exists(self.collection_name):
+                # Vectorizer is left to the server's default module, which near_text searches use
+                self.client.collections.create(self.collection_name, properties=GAMES_PROPERTIES)
+                logger.info(f"Created Weaviate collection {self.collection_name}")
+        
+        await asyncio.to_thread(_ensure)
+    
+    async def ping(self) -> bool:
+        """
+        Check whether Weaviate is ready to serve requests.
+        
+        Returns:
+            True if the instance is ready, False otherwise
+        """
+        try:
+            return await asyncio.to_thread(self.client.is_ready)
+        except Exception as e:
+            logger.warning(f"Weaviate ping failed: {e}")
+            return False
+    
     async def search_games(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Search for games using vector similarity.
@@ -57,12 +121,10 @@ class WeaviateClient:
             List of game information dictionaries
         """
         try:
-            games = self.client.collections.get(self.collection_name)
-            
-            response = games.query.near_text(
+            response = self.games.query.near_text(
                 query=query,
                 limit=limit,
-                return_metadata=weaviate.classes.query.MetadataQuery(
+                return_metadata=MetadataQuery(
                     score=True,
                     distance=True
                 )
@@ -94,8 +156,7 @@ class WeaviateClient:
             Game information dictionary or None if not found
         """
         try:
-            games = self.client.collections.get(self.collection_name)
-            game = games.query.fetch_object_by_id(game_id)
+            game = self.games.query.fetch_object_by_id(game_id)
             
             if game:
                 return {
@@ -108,24 +169,30 @@ class WeaviateClient:
             logger.error(f"Error retrieving game {game_id}: {e}")
             return None
     
-    async def get_upcoming_games(self, days_ahead: int = 30) -> List[Dict[str, Any]]:
+    async def get_upcoming_games(self, days_ahead: int = 30, limit: int = 10) -> List[Dict[str, Any]]:
         """
-        Get upcoming games within specified days.
+        Get upcoming games within specified days, soonest first.
+        
+        Uses a filtered scan on the game's "date" property rather than a vector search, so
+        it is answered from the inverted index. This needs the DATE-typed, filterable "date"
+        property that ensure_schema creates; an autoschema'd text "date" cannot be range-filtered.
         
         Args:
             days_ahead: Number of days to look ahead
+            limit: Maximum number of games to return
             
         Returns:
             List of upcoming games
         """
-        # This would typically use date filtering
-        # Implementation depends on your game data schema
         try:
-            games = self.client.collections.get(self.collection_name)
-            
-            response = games.query.near_text(
-                query="upcoming games schedule",
-                limit=10
+            now = datetime.now(timezone.utc)
+            response = self.games.query.fetch_objects(
+                filters=(
+                    Filter.by_property("date").greater_or_equal(now)
+                    & Filter.by_property("date").less_or_equal(now + timedelta(days=days_ahead))
+                ),
+                sort=Sort.by_property("date", ascending=True),
+                limit=limit
             )
             
             results = []
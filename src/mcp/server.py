@@ -5,12 +5,12 @@ MCP Server for Neo4j Integration
 Model Context Protocol server that provides secure access to Neo4j data for AI models.
 """
 
-import json
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Awaitable, Callable, List, Optional
 from dataclasses import dataclass
 from src.databases.neo4j_client import Neo4jClient
+from src.utils.serialization import dumps_str
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +26,29 @@ class MCPTool:
 class MCPServer:
     """MCP Server for providing Neo4j access to AI models."""
     
-    def __init__(self):
-        """Initialize MCP Server."""
-        self.neo4j_client = Neo4jClient()
+    def __init__(self, neo4j_client: Optional[Neo4jClient] = None):
+        """
+        Initialize MCP Server.
+        
+        Args:
+            neo4j_client: Optional shared Neo4j client; a dedicated one is created if omitted
+        """
+        self._owns_neo4j_client = neo4j_client is None
+        self.neo4j_client = neo4j_client or Neo4jClient()
         self.tools = self._register_tools()
+        self._dispatch = self._build_dispatch()
+        
+        # The tool list never changes, so build the tools/list response once
+        self._tools_list_response = {
+            "tools": [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "inputSchema": tool.input_schema
+                }
+                for tool in self.tools
+            ]
+        }
         self.server = None
     
     def _register_tools(self) -> List[MCPTool]:
@@ -68,6 +87,25 @@ class MCPServer:
                     "required": ["user_id"]
                 }
             ),
+            MCPTool(
+                name="get_user_context",
+                description="Get a user's profile, game history, preferences and similar users in one call",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "user_id": {
+                            "type": "string",
+                            "description": "Unique identifier for the user"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of history records to return",
+                            "default": 10
+                        }
+                    },
+                    "required": ["user_id"]
+                }
+            ),
             MCPTool(
                 name="get_user_preferences",
                 description="Get user's preferences including favorite teams and sports",
@@ -125,6 +163,33 @@ class MCPServer:
             )
         ]
     
+    def _build_dispatch(self) -> Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]]:
+        """Map each tool name to a coroutine function taking the call arguments."""
+        client = self.neo4j_client
+        return {
+            "get_user_profile": lambda args: client.get_user_profile(args["user_id"]),
+            "get_user_game_history": lambda args: client.get_user_game_history(
+                args["user_id"], args.get("limit", 10)
+            ),
+            "get_user_context": lambda args: client.get_user_context(
+                args["user_id"], args.get("limit", 10)
+            ),
+            "get_user_preferences": lambda args: client.get_user_preferences(args["user_id"]),
+            "get_similar_users": lambda args: client.get_similar_users(
+                args["user_id"], args.get("limit", 5)
+            ),
+            "record_interaction": self._record_interaction_tool,
+        }
+    
+    async def _record_interaction_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Record an interaction and wrap the outcome for the tool response."""
+        recorded = await self.neo4j_client.record_interaction(
+            args["user_id"],
+            args["interaction_type"],
+            args["details"]
+        )
+        return {"recorded": recorded}
+    
     async def handle_tool_call(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Handle a tool call from the AI model.
@@ -136,40 +201,14 @@ class MCPServer:
         Returns:
             Tool execution result
         """
+        handler = self._dispatch.get(tool_name)
+        if handler is None:
+            return {"success": False, "error": f"Unknown tool: {tool_name}"}
+        
         try:
-            if tool_name == "get_user_profile":
-                result = await self.neo4j_client.get_user_profile(arguments["user_id"])
-                return {"success": True, "data": result}
-            
-            elif tool_name == "get_user_game_history":
-                result = await self.neo4j_client.get_user_game_history(
-                    arguments["user_id"],
-                    arguments.get("limit", 10)
-                )
-                return {"success": True, "data": result}
-            
-            elif tool_name == "get_user_preferences":
-                result = await self.neo4j_client.get_user_preferences(arguments["user_id"])
-                return {"success": True, "data": result}
-            
-            elif tool_name == "get_similar_users":
-                result = await self.neo4j_client.get_similar_users(
-                    arguments["user_id"],
-                    arguments.get("limit", 5)
-                )
-                return {"success": True, "data": result}
+            result = await handler(arguments)
+            return {"success": True, "data": result}
             
-            elif tool_name == "record_interaction":
-                result = await self.neo4j_client.record_interaction(
-                    arguments["user_id"],
-                    arguments["interaction_type"],
-                    arguments["details"]
-                )
-                return {"success": True, "data": {"recorded": result}}
-            
-            else:
-                return {"success": False, "error": f"Unknown tool: {tool_name}"}
-                
         except Exception as e:
             logger.error(f"Error executing tool {tool_name}: {e}")
             return {"success": False, "error": str(e)}
@@ -178,6 +217,10 @@ class MCPServer:
         """
         Handle incoming MCP request.
         
+        Supports "tools/list", "tools/call", and "tools/batch", which takes
+        params["calls"] as a list of {"name", "arguments"} and returns one content
+        item per call, in order.
+        
         Args:
             request: MCP request message
             
@@ -189,16 +232,7 @@ class MCPServer:
             params = request.get("params", {})
             
             if method == "tools/list":
-                return {
-                    "tools": [
-                        {
-                            "name": tool.name,
-                            "description": tool.description,
-                            "inputSchema": tool.input_schema
-                        }
-                        for tool in self.tools
-                    ]
-                }
+                return self._tools_list_response
             
             elif method == "tools/call":
                 tool_name = params.get("name")
@@ -210,8 +244,26 @@ class MCPServer:
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(result, indent=2)
+                            "text": dumps_str(result)
+                        }
+                    ]
+                }
+            
+            elif method == "tools/batch":
+                # Independent tool calls share the driver pool, so run them concurrently
+                calls = params.get("calls", [])
+                results = await asyncio.gather(*(
+                    self.handle_tool_call(call.get("name"), call.get("arguments", {}))
+                    for call in calls
+                ))
+                
+                return {
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": dumps_str(result)
                         }
+                        for result in results
                     ]
                 }
             
@@ -241,8 +293,8 @@ class MCPServer:
     async def stop(self):
         """Stop the MCP server."""
         logger.info("Stopping MCP Server")
-        if self.neo4j_client:
-            self.neo4j_client.close()
+        if self.neo4j_client and self._owns_neo4j_client:
+            await self.neo4j_client.close()
     
     def get_context_for_user(self, user_id: str) -> str:
         """
@@ -0,0 +1,67 @@
+"""
+Batched Debug Logging
+=====================
+
+Collects high-frequency debug events and emits them as a single log record,
+so burst enqueues don't take the logging lock once per event.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, List, Tuple
+
+
+class BatchLogger:
+    """Buffers debug events and flushes them every N events or T seconds."""
+
+    def __init__(self, logger: logging.Logger, max_events: int = 256, flush_interval: float = 0.2):
+        """
+        Initialize the batch logger.
+
+        Args:
+            logger: Logger that receives the batched records
+            max_events: Flush once this many events are buffered
+            flush_interval: Flush when this many seconds have passed since the last flush
+        """
+        self.logger = logger
+        self.max_events = max_events
+        self.flush_interval = flush_interval
+        self._events: List[Tuple[Any, ...]] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush)
+
+    def debug(self, *event: Any):
+        """
+        Record a debug event.
+
+        Args:
+            *event: Event fields, e.g. ("add", task_id, agent_name)
+        """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+
+        with self._lock:
+            self._events.append(event)
+            now = time.monotonic()
+            if len(self._events) < self.max_events and now - self._last_flush < self.flush_interval:
+                return
+            events, self._events = self._events, []
+            self._last_flush = now
+
+        self._emit(events)
+
+    def flush(self):
+        """Emit any buffered events immediately."""
+        with self._lock:
+            events, self._events = self._events, []
+            self._last_flush = time.monotonic()
+
+        if events:
+            self._emit(events)
+
+    def _emit(self, events: List[Tuple[Any, ...]]):
+        """Write a batch of events as one log record."""
+        self.logger.debug("batch: %d events: %s", len(events), events)
@@ -0,0 +1,87 @@
+"""
+Micro-Batching Utilities
+========================
+
+Coalesces concurrent single-key lookups into one bulk request.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Groups concurrent lookups and flushes them as one bulk fetch."""
+
+    def __init__(self, fetch: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+                 max_size: int = 32, max_delay: float = 0.02):
+        """
+        Initialize the batcher.
+
+        Args:
+            fetch: Coroutine function taking a list of keys and returning a key -> value mapping
+            max_size: Flush as soon as this many keys are pending
+            max_delay: Maximum time in seconds to wait for more keys before flushing
+        """
+        self.fetch = fetch
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def get(self, key: Hashable) -> Any:
+        """
+        Queue a key for the next batch and wait for its value.
+
+        Args:
+            key: Key to look up
+
+        Returns:
+            Value returned by the bulk fetch for this key (None if missing)
+        """
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+
+            if len(self._pending) >= self.max_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+
+        return await future
+
+    async def flush(self):
+        """Send any pending keys now and wait for all in-flight batches to finish."""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _flush(self):
+        """Send all pending keys as a single bulk fetch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: Dict[Hashable, asyncio.Future]):
+        """Execute the bulk fetch and resolve the waiting futures."""
+        try:
+            results = await self.fetch(list(batch))
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+
+        except Exception as e:
+            logger.error(f"Batch fetch of {len(batch)} keys failed: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
@@ -6,63 +6,81 @@ Centralized configuration management for the ticket sales agent system.
 """
 
 import os
+import functools
 from typing import Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
 
+def _env(name: str, default: str = ""):
+    """Dataclass field read from the environment when the config is built, not at import."""
+    return field(default_factory=lambda: os.getenv(name, default))
 
-@dataclass
+
+def neo4j_pool_size() -> int:
+    """
+    Neo4j connection pool size, from NEO4J_MAX_POOL or two connections per concurrent call.
+    
+    Returns:
+        Maximum number of pooled Bolt connections
+    """
+    pool_size = os.getenv("NEO4J_MAX_POOL")
+    if pool_size:
+        return int(pool_size)
+    return AppConfig().max_concurrent_calls * 2
+
+
+@dataclass(slots=True, frozen=True)
 class DatabaseConfig:
     """Database configuration settings."""
     
     # Weaviate settings
-    weaviate_url: str = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-    weaviate_api_key: str = os.getenv("WEAVIATE_API_KEY", "")
+    weaviate_url: str = _env("WEAVIATE_URL", "http://localhost:8080")
+    weaviate_api_key: str = _env("WEAVIATE_API_KEY", "")
     
     # Neo4j settings
-    neo4j_uri: str = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-    neo4j_username: str = os.getenv("NEO4J_USERNAME", "neo4j")
-    neo4j_password: str = os.getenv("NEO4J_PASSWORD", "")
+    neo4j_uri: str = _env("NEO4J_URI", "bolt://localhost:7687")
+    neo4j_username: str = _env("NEO4J_USERNAME", "neo4j")
+    neo4j_password: str = _env("NEO4J_PASSWORD", "")
+    neo4j_database: str = _env("NEO4J_DATABASE", "neo4j")
+    neo4j_max_pool: int = field(default_factory=neo4j_pool_size)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VAPIConfig:
     """VAPI configuration settings."""
     
-    api_key: str = os.getenv("VAPI_API_KEY", "")
-    base_url: str = os.getenv("VAPI_BASE_URL", "https://api.vapi.ai")
+    api_key: str = _env("VAPI_API_KEY", "")
+    base_url: str = _env("VAPI_BASE_URL", "https://api.vapi.ai")
     default_voice: str = "alloy"
     max_call_duration: int = 300  # 5 minutes
     recording_enabled: bool = True
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OpenAIConfig:
     """OpenAI configuration settings."""
     
-    api_key: str = os.getenv("OPENAI_API_KEY", "")
+    api_key: str = _env("OPENAI_API_KEY", "")
     model: str = "gpt-4o-realtime-preview"
     temperature: float = 0.7
     max_tokens: int = 300
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MCPConfig:
     """MCP Server configuration settings."""
     
-    host: str = os.getenv("MCP_SERVER_HOST", "localhost")
-    port: int = int(os.getenv("MCP_SERVER_PORT", "8000"))
+    host: str = _env("MCP_SERVER_HOST", "localhost")
+    port: int = field(default_factory=lambda: int(os.getenv("MCP_SERVER_PORT", "8000")))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AppConfig:
     """Application configuration settings."""
     
-    log_level: str = os.getenv("LOG_LEVEL", "INFO")
-    environment: str = os.getenv("ENVIRONMENT", "development")
+    log_level: str = _env("LOG_LEVEL", "INFO")
+    environment: str = _env("ENVIRONMENT", "development")
     max_concurrent_calls: int = 10
     call_retry_attempts: int = 3
     call_retry_delay: int = 5  # seconds
@@ -80,6 +98,9 @@ class ConfigManager:
         self.app = AppConfig()
         
         self._validate_config()
+        
+        # Config is frozen after load, so the redacted view only needs building once
+        self._dict = self._build_dict()
     
     def _validate_config(self):
         """Validate required configuration values."""
@@ -116,11 +137,16 @@ class ConfigManager:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary (excluding sensitive data)."""
+        return self._dict
+    
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build the redacted configuration dictionary."""
         return {
             "database": {
                 "weaviate_url": self.database.weaviate_url,
                 "neo4j_uri": self.database.neo4j_uri,
-                "neo4j_username": self.database.neo4j_username
+                "neo4j_username": self.database.neo4j_username,
+                "neo4j_max_pool": self.database.neo4j_max_pool
             },
             "vapi": {
                 "base_url": self.vapi.base_url,
@@ -145,5 +171,16 @@ class ConfigManager:
         }
 
 
-# Global configuration instance
-config = ConfigManager()
+@functools.cache
+def get_config() -> ConfigManager:
+    """
+    Get the process-wide configuration, loading .env and validating it on first use.
+    
+    Returns:
+        Shared configuration manager
+    
+    Raises:
+        ValueError: If required configuration values are missing
+    """
+    load_dotenv()
+    return ConfigManager()
@@ -0,0 +1,42 @@
+"""
+JSON Serialization
+==================
+
+Fast JSON encoding/decoding built on orjson, shared by agents, the MCP server and VAPI.
+"""
+
+from typing import Any
+import orjson
+
+# Dataclasses and naive datetimes are encoded natively; anything else falls back to str()
+_BASE_OPTIONS = orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    Serialize an object to JSON bytes.
+
+    Args:
+        obj: Object to serialize
+        sort_keys: Emit object keys in sorted order (for stable hashing)
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    option = _BASE_OPTIONS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=str, option=option)
+
+
+def dumps_str(obj: Any, sort_keys: bool = False, indent: bool = False) -> str:
+    """Serialize an object to a JSON string."""
+    return dumps(obj, sort_keys=sort_keys, indent=indent).decode()
+
+
+def loads(data: Any) -> Any:
+    """Deserialize JSON from bytes or str."""
+    return orjson.loads(data)
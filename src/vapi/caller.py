@@ -6,25 +6,93 @@ Handles integration with VAPI for making voice calls using Realtime API.
 """
 
 import os
-import json
 import logging
 import asyncio
-from typing import Dict, Any, Optional, Callable
+import time
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Callable
 import httpx
-import websockets
-from openai import OpenAI
+from src.vapi.http_client import close_http_client, get_http_client
+from src.utils.serialization import dumps, loads
+from src.vapi.dedup import CALL_DEDUP_WINDOW, CALL_END_EVENTS, CallDeduplicator, call_key
 
 logger = logging.getLogger(__name__)
 
+# Call monitoring keeps one WebSocket open per call; pings only keep the connection alive
+MONITOR_PING_INTERVAL = 20  # seconds
+MONITOR_PING_TIMEOUT = 20  # seconds
+MONITOR_MAX_QUEUE = 64
+
+# Fixed opening and closing sections of every call context
+CONTEXT_HEADER = "\n".join([
+    "TICKET SALES AGENT CONTEXT",
+    "=" * 30,
+    "",
+    "ROLE: You are a friendly and knowledgeable ticket sales agent calling to offer",
+    "game tickets based on the customer's interests and history.",
+    "",
+    "USER INFORMATION:",
+])
+CONTEXT_FOOTER = "\n".join([
+    "",
+    "CONVERSATION GUIDELINES:",
+    "- Be warm, friendly, and professional",
+    "- Reference their past attendance and preferences",
+    "- Focus on games that match their interests",
+    "- Ask about their availability and preferences",
+    "- Handle objections gracefully",
+    "- Always end with a clear next step",
+    "",
+    "Remember: This is a real customer call. Be natural and conversational!"
+])
+
+# Call-independent part of every assistant configuration; nested sections are shared, treat as read-only
+ASSISTANT_TEMPLATE: Mapping[str, Any] = MappingProxyType({
+    "model": {
+        "provider": "openai",
+        "model": "gpt-4o-realtime-preview",
+        "temperature": 0.7,
+        "maxTokens": 300
+    },
+    "voice": {
+        "provider": "openai",
+        "voiceId": "alloy"  # Can be: alloy, echo, fable, onyx, nova, shimmer
+    },
+    "transcriber": {
+        "provider": "deepgram",
+        "model": "nova-2",
+        "language": "en-US"
+    },
+    "firstMessage": "Hi! This is calling from the ticket office. I hope you're having a great day!",
+    "endCallMessage": "Thank you for your time! Have a wonderful day!",
+    "recordingEnabled": True,
+    "endCallPhrases": ["goodbye", "hang up", "end call"],
+    "maxDurationSeconds": 300  # 5 minutes max
+})
+
 
 class VAPIClient:
     """Client for making voice calls through VAPI with Realtime API integration."""
     
-    def __init__(self):
-        """Initialize VAPI client."""
-        self.api_key = os.getenv("VAPI_API_KEY")
-        self.base_url = os.getenv("VAPI_BASE_URL", "https://api.vapi.ai")
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, config=None, openai_config=None, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize VAPI client.
+        
+        Args:
+            config: Optional VAPIConfig; settings are read from the environment if omitted
+            openai_config: Optional OpenAIConfig; the API key is read from the environment if omitted
+            http_client: Optional HTTP client; the process-wide shared client is used if omitted
+        """
+        self.http_client = http_client
+        if config is not None:
+            self.api_key = config.api_key
+            self.base_url = config.base_url
+        else:
+            self.api_key = os.getenv("VAPI_API_KEY")
+            self.base_url = os.getenv("VAPI_BASE_URL", "https://api.vapi.ai")
+        
+        self._openai_api_key = openai_config.api_key if openai_config is not None else os.getenv("OPENAI_API_KEY")
+        self._openai_client = None
         
         if not self.api_key:
             raise ValueError("VAPI_API_KEY environment variable is required")
@@ -33,9 +101,43 @@ class VAPIClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Strong references so monitor tasks are not garbage collected mid-call
+        self._monitor_tasks = set()
+        
+        # In-flight and recently placed calls, keyed by (phone number, assistant); VAPI
+        # reports failed dials as {"error": ...} results, which must stay retryable
+        self._recent_calls = CallDeduplicator(is_failure=lambda call_data: "error" in call_data)
+    
+    @property
+    def openai_client(self):
+        """OpenAI client, created on first use so importing and constructing VAPIClient stays cheap."""
+        if self._openai_client is None:
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=self._openai_api_key)
+        return self._openai_client
+    
+    async def _get_http_client(self) -> httpx.AsyncClient:
+        """Get the injected HTTP client or the shared keep-alive client."""
+        if self.http_client is not None:
+            return self.http_client
+        return await get_http_client()
+    
+    async def aclose(self):
+        """Close the injected HTTP client, or the shared client if none was injected."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        else:
+            await close_http_client()
     
-    async def create_call_context(self, user_data: Dict[str, Any], 
-                                game_data: Dict[str, Any]) -> str:
+    async def __aenter__(self) -> "VAPIClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    def create_call_context(self, user_data: Dict[str, Any], 
+                            game_data: Dict[str, Any]) -> str:
         """
         Create context for the AI model based on user and game data.
         
@@ -46,49 +148,36 @@ class VAPIClient:
         Returns:
             Formatted context string
         """
-        context_parts = [
-            "TICKET SALES AGENT CONTEXT",
-            "=" * 30,
-            "",
-            "ROLE: You are a friendly and knowledgeable ticket sales agent calling to offer",
-            "game tickets based on the customer's interests and history.",
-            "",
-            "USER INFORMATION:",
-        ]
+        # One formatted block per section, joined once at the end
+        context_parts = [CONTEXT_HEADER]
         
-        if user_data.get("profile"):
-            profile = user_data["profile"]
-            context_parts.extend([
-                f"- Name: {profile.get('name', 'Customer')}",
-                f"- Email: {profile.get('email', 'N/A')}",
-                f"- Phone: {profile.get('phone', 'N/A')}",
-            ])
+        profile = user_data.get("profile")
+        if profile:
+            context_parts.append(
+                f"- Name: {profile.get('name', 'Customer')}\n"
+                f"- Email: {profile.get('email', 'N/A')}\n"
+                f"- Phone: {profile.get('phone', 'N/A')}"
+            )
         
-        if user_data.get("preferences"):
-            prefs = user_data["preferences"]
-            context_parts.extend([
-                "",
-                "PREFERENCES:",
-                f"- Favorite Teams: {', '.join(prefs.get('favorite_teams', []))}",
-                f"- Favorite Sports: {', '.join(prefs.get('favorite_sports', []))}",
-            ])
+        prefs = user_data.get("preferences")
+        if prefs:
+            context_parts.append(
+                "\nPREFERENCES:\n"
+                f"- Favorite Teams: {', '.join(prefs.get('favorite_teams', []))}\n"
+                f"- Favorite Sports: {', '.join(prefs.get('favorite_sports', []))}"
+            )
         
-        if user_data.get("history"):
-            context_parts.extend([
-                "",
-                "RECENT GAME ATTENDANCE:",
-            ])
-            for game in user_data["history"][:3]:  # Show last 3 games
-                context_parts.append(
-                    f"- {game.get('game_title', 'Game')} at {game.get('venue', 'N/A')} "
-                    f"({game.get('game_date', 'N/A')})"
-                )
+        history = user_data.get("history")
+        if history:
+            context_parts.append("\nRECENT GAME ATTENDANCE:")
+            context_parts += [
+                f"- {game.get('game_title', 'Game')} at {game.get('venue', 'N/A')} "
+                f"({game.get('game_date', 'N/A')})"
+                for game in history[:3]  # Show last 3 games
+            ]
         
         if game_data:
-            context_parts.extend([
-                "",
-                "AVAILABLE GAMES TO PROMOTE:",
-            ])
+            context_parts.append("\nAVAILABLE GAMES TO PROMOTE:")
             for game in game_data[:2]:  # Show top 2 recommended games
                 props = game.get("properties", {})
                 context_parts.append(
@@ -96,22 +185,11 @@ class VAPIClient:
                     f"at {props.get('venue', 'TBD')}"
                 )
         
-        context_parts.extend([
-            "",
-            "CONVERSATION GUIDELINES:",
-            "- Be warm, friendly, and professional",
-            "- Reference their past attendance and preferences",
-            "- Focus on games that match their interests",
-            "- Ask about their availability and preferences",
-            "- Handle objections gracefully",
-            "- Always end with a clear next step",
-            "",
-            "Remember: This is a real customer call. Be natural and conversational!"
-        ])
+        context_parts.append(CONTEXT_FOOTER)
         
         return "\n".join(context_parts)
     
-    async def create_assistant(self, context: str) -> Dict[str, Any]:
+    def create_assistant(self, context: str) -> Dict[str, Any]:
         """
         Create a VAPI assistant with the given context.
         
@@ -121,104 +199,142 @@ class VAPIClient:
         Returns:
             Assistant configuration
         """
-        assistant_config = {
-            "model": {
-                "provider": "openai",
-                "model": "gpt-4o-realtime-preview",
-                "systemMessage": context,
-                "temperature": 0.7,
-                "maxTokens": 300
-            },
-            "voice": {
-                "provider": "openai",
-                "voiceId": "alloy"  # Can be: alloy, echo, fable, onyx, nova, shimmer
-            },
-            "transcriber": {
-                "provider": "deepgram",
-                "model": "nova-2",
-                "language": "en-US"
-            },
-            "firstMessage": "Hi! This is calling from the ticket office. I hope you're having a great day!",
-            "endCallMessage": "Thank you for your time! Have a wonderful day!",
-            "recordingEnabled": True,
-            "endCallPhrases": ["goodbye", "hang up", "end call"],
-            "maxDurationSeconds": 300  # 5 minutes max
+        # Only the system message varies per call; the nested settings are shared
+        return {
+            **ASSISTANT_TEMPLATE,
+            "model": {**ASSISTANT_TEMPLATE["model"], "systemMessage": context}
         }
-        
-        return assistant_config
     
     async def make_call(self, phone_number: str, assistant_config: Dict[str, Any],
                        callback: Optional[Callable] = None) -> Dict[str, Any]:
         """
         Initiate a phone call using VAPI.
         
+        A repeat request for the same number and assistant within CALL_DEDUP_WINDOW
+        seconds does not dial again; it returns the first call's information. Such a
+        duplicate gets no monitoring: its callback is not called, and only the first
+        request's callback receives call events.
+        
         Args:
             phone_number: Phone number to call
             assistant_config: Assistant configuration
-            callback: Optional callback for call events
+            callback: Optional callback for call events (ignored for duplicates, see above)
             
         Returns:
             Call information
         """
+        key = call_key(phone_number, dumps(assistant_config, sort_keys=True))
+        if key in self._recent_calls:
+            logger.info(f"Reusing recent call to {phone_number} instead of dialing again")
+            if callback:
+                logger.warning(f"Duplicate call to {phone_number} is not monitored; its callback will not be called")
+        
+        return await self._recent_calls.run(
+            key, lambda: self._place_call(phone_number, assistant_config, callback)
+        )
+    
+    async def _place_call(self, phone_number: str, assistant_config: Dict[str, Any],
+                          callback: Optional[Callable]) -> Dict[str, Any]:
+        """Send the create-call request and start monitoring if requested."""
         try:
             call_payload = {
                 "assistant": assistant_config,
                 "phoneNumber": phone_number,
                 "metadata": {
                     "purpose": "ticket_sales",
-                    "timestamp": asyncio.get_event_loop().time()
+                    "timestamp": time.time()
                 }
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/call/phone",
-                    json=call_payload,
-                    headers=self.headers,
-                    timeout=30.0
-                )
+            client = await self._get_http_client()
+            response = await client.post(
+                f"{self.base_url}/call/phone",
+                content=dumps(call_payload),
+                headers=self.headers,
+                timeout=30.0
+            )
+            
+            if response.status_code == 201:
+                call_data = loads(response.content)
+                call_id = call_data.get("id")
+                
+                logger.info(f"Call initiated successfully: {call_id}")
+                
+                # Monitor call if callback provided and VAPI returned a monitor URL
+                monitor_url = (call_data.get("monitor") or {}).get("listenUrl")
+                if callback and monitor_url:
+                    task = asyncio.create_task(self._monitor_call(call_id, monitor_url, callback))
+                    self._monitor_tasks.add(task)
+                    task.add_done_callback(self._monitor_tasks.discard)
+                
+                return call_data
+            else:
+                error_msg = f"Failed to initiate call: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                return {"error": error_msg}
                 
-                if response.status_code == 201:
-                    call_data = response.json()
-                    call_id = call_data.get("id")
-                    
-                    logger.info(f"Call initiated successfully: {call_id}")
-                    
-                    # Monitor call if callback provided
-                    if callback:
-                        asyncio.create_task(self._monitor_call(call_id, callback))
-                    
-                    return call_data
-                else:
-                    error_msg = f"Failed to initiate call: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    return {"error": error_msg}
-                    
         except Exception as e:
             logger.error(f"Error making call: {e}")
             return {"error": str(e)}
     
-    async def _monitor_call(self, call_id: str, callback: Callable):
+    async def _monitor_call(self, call_id: str, monitor_url: str, callback: Callable):
         """
-        Monitor call progress and events.
+        Stream call events to a callback over one WebSocket until the call ends.
         
         Args:
             call_id: Call identifier
-            callback: Callback function for events
+            monitor_url: WebSocket URL from the call's monitor settings
+            callback: Sync or async function called with each decoded event
         """
         try:
-            # WebSocket connection for real-time call monitoring
-            # This is a simplified implementation
-            logger.info(f"Monitoring call {call_id}")
-            
-            # In a real implementation, you'd connect to VAPI's WebSocket endpoint
-            # and listen for call events like: started, ended, speech, etc.
+            # Only monitored calls need websockets, so its import cost is paid on first use
+            import websockets
             
-            await asyncio.sleep(1)  # Placeholder for actual monitoring
+            logger.info(f"Monitoring call {call_id}")
+            async with websockets.connect(
+                monitor_url,
+                extra_headers={"Authorization": f"Bearer {self.api_key}"},
+                ping_interval=MONITOR_PING_INTERVAL,
+                ping_timeout=MONITOR_PING_TIMEOUT,
+                max_queue=MONITOR_MAX_QUEUE
+            ) as ws:
+                async for message in ws:
+                    # Binary frames carry call audio; only text frames are events
+                    if isinstance(message, bytes):
+                        continue
+                    
+                    event = loads(message)
+                    result = callback(event)
+                    if asyncio.iscoroutine(result):
+                        await result
+                    
+                    if isinstance(event, dict) and event.get("type") in CALL_END_EVENTS:
+                        break
             
         except Exception as e:
             logger.error(f"Error monitoring call {call_id}: {e}")
     
+    async def ping(self) -> bool:
+        """
+        Check whether the VAPI API is reachable with the configured key.
+        
+        Returns:
+            True if the API accepted the request, False otherwise
+        """
+        try:
+            client = await self._get_http_client()
+            response = await client.get(
+                f"{self.base_url}/assistant",
+                params={"limit": 1},
+                headers=self.headers,
+                timeout=5.0
+            )
+            return response.status_code == 200
+            
+        except Exception as e:
+            logger.warning(f"VAPI ping failed: {e}")
+            return False
+    
     async def get_call_status(self, call_id: str) -> Dict[str, Any]:
         """
         Get current call status.
@@ -230,18 +346,18 @@ class VAPIClient:
             Call status information
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/call/{call_id}",
-                    headers=self.headers,
-                    timeout=10.0
-                )
+            client = await self._get_http_client()
+            response = await client.get(
+                f"{self.base_url}/call/{call_id}",
+                headers=self.headers,
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                return loads(response.content)
+            else:
+                return {"error": f"Failed to get call status: {response.status_code}"}
                 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    return {"error": f"Failed to get call status: {response.status_code}"}
-                    
         except Exception as e:
             logger.error(f"Error getting call status: {e}")
             return {"error": str(e)}
@@ -257,16 +373,16 @@ class VAPIClient:
             True if successful, False otherwise
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.patch(
-                    f"{self.base_url}/call/{call_id}",
-                    json={"status": "ended"},
-                    headers=self.headers,
-                    timeout=10.0
-                )
-                
-                return response.status_code == 200
-                
+            client = await self._get_http_client()
+            response = await client.patch(
+                f"{self.base_url}/call/{call_id}",
+                json={"status": "ended"},
+                headers=self.headers,
+                timeout=10.0
+            )
+            
+            return response.status_code == 200
+            
         except Exception as e:
             logger.error(f"Error ending call {call_id}: {e}")
             return False
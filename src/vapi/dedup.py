@@ -0,0 +1,82 @@
+"""
+Call Deduplication
+==================
+
+Shares one in-flight or recently placed outbound call between repeated requests for the
+same call (retries, double submits), so the number is dialed once. Used by both the
+VAPIClient and the MCP server's webhook integration.
+"""
+
+import asyncio
+import functools
+import hashlib
+from typing import Any, Awaitable, Callable, Optional, Union
+from src.utils.ttl_cache import TTLCache
+
+# Repeated requests for the same call within this window share the first call
+CALL_DEDUP_WINDOW = 60  # seconds
+CALL_DEDUP_MAXSIZE = 1024
+
+# Event types (webhook and monitor stream) that mark a call as finished
+CALL_END_EVENTS = frozenset({"call.ended", "ended", "call.completed"})
+
+
+def call_key(*parts: Union[str, bytes]) -> bytes:
+    """
+    Build a compact dedup key from the inputs that identify a call.
+
+    Args:
+        *parts: Call inputs (number, assistant, prompts); str parts are UTF-8 encoded
+
+    Returns:
+        16-byte digest of the NUL-joined parts
+    """
+    joined = b"\0".join(p if isinstance(p, bytes) else p.encode() for p in parts)
+    return hashlib.sha256(joined).digest()[:16]
+
+
+class CallDeduplicator:
+    """In-flight and recently placed calls by key, for use from a single event loop."""
+
+    def __init__(self, window: float = CALL_DEDUP_WINDOW, maxsize: int = CALL_DEDUP_MAXSIZE,
+                 is_failure: Optional[Callable[[Any], bool]] = None):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            window: Seconds a placed call is reused for repeats
+            maxsize: Maximum number of remembered calls
+            is_failure: Optional check for results that report a failure instead of raising
+        """
+        self._calls = TTLCache(maxsize=maxsize, ttl=window)
+        self._is_failure = is_failure
+
+    def __contains__(self, key: bytes) -> bool:
+        return self._calls.get(key) is not None
+
+    async def run(self, key: bytes, place: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Place a call, or share the in-flight or recent call with the same key.
+
+        Args:
+            key: Dedup key from call_key()
+            place: Coroutine function that places the call; only invoked for a new key
+
+        Returns:
+            Result of the (possibly shared) call
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(place())
+            self._calls.set(key, call)
+            call.add_done_callback(functools.partial(self._forget_failed_call, key))
+        # Shielded so one caller giving up doesn't cancel the call for the others
+        return await asyncio.shield(call)
+
+    def _forget_failed_call(self, key: bytes, call: asyncio.Future):
+        """Drop a failed call so it can be retried immediately."""
+        failed = call.cancelled() or call.exception() is not None
+        if not failed and self._is_failure is not None:
+            failed = self._is_failure(call.result())
+        if failed and self._calls.get(key) is call:
+            self._calls.pop(key)
@@ -0,0 +1,57 @@
+"""
+Shared HTTP Client for VAPI
+===========================
+
+Lazily creates one keep-alive httpx.AsyncClient per event loop so VAPI requests reuse
+TLS connections instead of opening a new one for every call. Pooled connections belong
+to the loop that opened them, so each loop gets its own client, and a loop's client is
+released together with the loop.
+"""
+
+import asyncio
+import logging
+import weakref
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connection limits shared by every VAPI request in the process
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 60  # seconds
+
+# Keyed weakly by loop so a finished loop doesn't keep its client alive
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for the running event loop, creating it on first use.
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    # No await between the check and the assignment, so no lock is needed within a loop
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        # HTTP/2 multiplexes concurrent outbound calls over one connection (falls back to 1.1 via ALPN)
+        client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            )
+        )
+        _clients[loop] = client
+        logger.info("Created shared VAPI HTTP client")
+
+    return client
+
+
+async def close_http_client():
+    """Close the running event loop's shared HTTP client if it was created."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,15 +1,24 @@
 import os
-import json
+import asyncio
 import threading
-import time
 import re
+import functools
+import logging
+from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional
 
-import requests
-from fastapi import FastAPI, Request
-from fastapi.responses import PlainTextResponse, JSONResponse
-import uvicorn
-from jinja2 import Template
+import httpx
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from src.utils.ttl_cache import TTLCache
+from src.vapi.dedup import CALL_END_EVENTS, CallDeduplicator, call_key
+
+# stdout carries the MCP stdio JSON-RPC stream, so all diagnostics go through logging (stderr)
+logger = logging.getLogger(__name__)
 
 # =========================
 # ENV VARS (set these)
@@ -22,101 +31,366 @@ VAPI_API_KEY        = os.getenv("6aae2ead-2aef-4c92-b025-49dbbb6b55ff")       #
 # Optional defaults
 TEAM_NAME_DEFAULT   = os.getenv("TEAM_NAME_DEFAULT", "SF Giants")
 PURCHASE_LINK_FALLBACK = os.getenv("PURCHASE_LINK_FALLBACK", "https://tickets.example.com/giants/single-game")
+REDIS_URL           = os.getenv("REDIS_URL", "")          # optional; call state stays in-process without it
 
 # =========================
 # VARIABLE PROMPT TEMPLATES
-# (You can edit these; they are rendered at call time)
+# (You can edit these; they are rendered at call time with str.format_map)
+# Missing or empty variables fall back to the *_DEFAULTS below
 # =========================
-SYSTEM_TEMPLATE = Template("""
+SYSTEM_TEMPLATE = """
 You are a professional sports ticket sales representative making outbound calls to fans who have prior history with the team.
 Always simulate the flow of a live phone conversation.
 
 Start with a warm, professional introduction.
 
 Use MCP/CRM data naturally if present:
-- Fan: {{ fan_name or "there" }}
-- Prior connection: {{ prior_context or "previous engagement with the team" }}
-- Favorite player: {{ favorite_player or "N/A" }}
+- Fan: {fan_name}
+- Prior connection: {prior_context}
+- Favorite player: {favorite_player}
 
-Focus on selling **single-game tickets** (spotlight: {{ spotlight_game or "upcoming home game" }}) in a friendly, confident tone — persuasive, never begging.
+Focus on selling **single-game tickets** (spotlight: {spotlight_game}) in a friendly, confident tone — persuasive, never begging.
 
 Keep responses short and conversational, like real phone dialogue.
 Handle objections with simple reassurance and concrete options (date alternatives, value sections, transparent pricing).
 
 Always move toward the close and provide a clear purchase link **in-call** before hanging up:
-{{ purchase_link or fallback_link }}
+{purchase_link}
 
 Success criteria (binary): the call is only successful if you (1) greet professionally, (2) pitch single-game tickets, and (3) provide the purchase link before ending.
 
 Stay fully in character as a phone sales rep.
-""".strip())
+""".strip()
 
-FIRST_MESSAGE_TEMPLATE = Template("""
-Hi {{ fan_name or "there" }}, this is {{ rep_name or "Fangio" }} from the {{ team_name or team_default }} ticket office.
-I saw you {{ prior_context or "connected with us before" }}, and I’ve got great single-game options for {{ spotlight_game or "our next home game" }}.
+FIRST_MESSAGE_TEMPLATE = """
+Hi {fan_name}, this is {rep_name} from the {team_name} ticket office.
+I saw you {prior_context}, and I’ve got great single-game options for {spotlight_game}.
 Do you have a quick minute?
-""".strip())
+""".strip()
+
+SYSTEM_DEFAULTS = {
+    "fan_name": "there",
+    "prior_context": "previous engagement with the team",
+    "favorite_player": "N/A",
+    "spotlight_game": "upcoming home game",
+    "purchase_link": "",
+}
+FIRST_MESSAGE_DEFAULTS = {
+    "fan_name": "there",
+    "rep_name": "Fangio",
+    "team_name": "",
+    "prior_context": "connected with us before",
+    "spotlight_game": "our next home game",
+}
+
+def _fill(defaults: Dict[str, str], variables: Dict[str, Any]) -> Dict[str, Any]:
+    # `value or default`, so None and "" fall back just like missing keys
+    return {key: variables.get(key) or default for key, default in defaults.items()}
+
+def _render_prompts(variables: Dict[str, Any]) -> tuple:
+    variables = {
+        **variables,
+        "purchase_link": variables.get("purchase_link") or variables.get("fallback_link"),
+        "team_name": variables.get("team_name") or variables.get("team_default"),
+    }
+    return (
+        SYSTEM_TEMPLATE.format_map(_fill(SYSTEM_DEFAULTS, variables)),
+        FIRST_MESSAGE_TEMPLATE.format_map(_fill(FIRST_MESSAGE_DEFAULTS, variables)),
+    )
+
+@functools.lru_cache(maxsize=512)
+def _render_prompts_cached(items: tuple) -> tuple:
+    return _render_prompts(dict(items))
+
+def render_prompts(variables: Dict[str, Any]) -> tuple:
+    """
+    Render (system_prompt, first_message). Repeated fans, retries and batches
+    usually send identical variables, so renders are memoized on the sorted items.
+    """
+    key = tuple(sorted(variables.items()))
+    try:
+        return _render_prompts_cached(key)
+    except TypeError:
+        # Unhashable values (lists, dicts) can't be cached; render directly
+        return _render_prompts(variables)
 
 # =========================
 # RUNTIME STATE (very light)
 # =========================
-CALL_STATE: Dict[str, Dict[str, Any]] = {}  # keyed by vapi call id (or provided event id)
+# With REDIS_URL set, call state lives in Redis hashes (call:<id>) so several workers
+# can share it; CALL_STATE is then only the fallback when Redis errors
+REDIS: Optional[aioredis.Redis] = None
+CALL_STATE_TTL = 3600  # seconds
+CALL_STATE_MAXSIZE = 10000
+
+# Keyed by vapi call id (or provided event id); bounded so abandoned calls don't pile up.
+# Only touched from the webhook server's loop.
+CALL_STATE = TTLCache(maxsize=CALL_STATE_MAXSIZE, ttl=CALL_STATE_TTL)
+
+# Outbound dials from the last minute, keyed by a digest of the call inputs, so MCP
+# retries and double submits reuse the first call instead of dialing again
+INFLIGHT_CALLS = CallDeduplicator()
+
+# Event loop of the webhook server; the shared HTTP client lives on it
+HTTP_LOOP: Optional[asyncio.AbstractEventLoop] = None
+HTTP_READY = threading.Event()
+
+# Webhook events are queued and applied in batches, one state update per call per flush
+EVENT_Q: Optional[asyncio.Queue] = None
+EVENT_Q_MAXSIZE = 10000
+EVENT_FLUSH_INTERVAL = 0.1  # seconds
+DRAIN_STOP = None  # queued at shutdown so drain_events() finishes its batch and exits
 
 # =========================
 # FASTAPI APP (for Vapi webhooks)
 # =========================
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    One keep-alive client for every outbound Vapi request, so calls reuse the
+    TLS connection to api.vapi.ai instead of handshaking each time.
+    """
+    global HTTP_LOOP, EVENT_Q, REDIS
+    app.state.http = httpx.AsyncClient(
+        base_url="https://api.vapi.ai",
+        headers=vapi_headers(),
+        timeout=20.0,
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30)
+    )
+    if REDIS_URL:
+        REDIS = aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
+    EVENT_Q = asyncio.Queue(maxsize=EVENT_Q_MAXSIZE)
+    drain_task = asyncio.create_task(drain_events())
+    HTTP_LOOP = asyncio.get_running_loop()
+    try:
+        yield
+    finally:
+        HTTP_READY.clear()
+        # Let the drain task finish the batch it is applying instead of cancelling it mid-write
+        await EVENT_Q.put(DRAIN_STOP)
+        await drain_task
+        # Apply anything queued behind the stop marker before shutting down
+        items = []
+        while not EVENT_Q.empty():
+            items.append(EVENT_Q.get_nowait())
+        await process_batch(items)
+        await app.state.http.aclose()
+        if REDIS is not None:
+            await REDIS.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+OK_BODY = orjson.dumps({"ok": True})
+BAD_BODY = orjson.dumps({"ok": False, "error": "expected a JSON object"})
+
+URL_RE = re.compile(r"https?://\S+")
+# Single-pass check for the sales pitch; case-insensitive instead of lowercasing a copy
+PITCH_RE = re.compile(r"ticket|single-game", re.IGNORECASE)
+# How far each transcript delta scan backs up so a URL scheme or pitch phrase split
+# across two events is still found (len("single-game"))
+SCAN_OVERLAP = 11
 
 def extract_link(text: str) -> bool:
-    return bool(re.search(r"https?://\S+", text or ""))
-
-@app.post("/vapi/events")
-async def vapi_events(req: Request):
+    # Cheap substring check first; most transcript chunks contain no URL at all
+    return bool(text) and "http" in text and URL_RE.search(text) is not None
+
+async def send_json(send, status: int, body: bytes) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class VapiEventsEndpoint:
     """
     Generic Vapi webhook. Logs transcripts/summaries and computes binary success.
     Expecting events like:
       - call.updated / call.ended
       - transcript.updated
       - analysis.summary (if configured)
-    """
-    body = await req.json()
-    event = body.get("type") or body.get("event") or "unknown"
-    data  = body.get("data", {})
-    call_id = data.get("id") or data.get("callId") or body.get("callId") or "unknown"
-
-    st = CALL_STATE.setdefault(call_id, {"transcript": "", "link_sent": False, "summary": ""})
+    Events are only queued here; drain_events() applies them in batches.
 
-    # Some Vapi setups send running transcript or message chunks:
-    transcript = data.get("transcript") or body.get("transcript") or ""
+    A raw ASGI callable rather than a FastAPI route: it reads the body bytes straight
+    off `receive` and skips Request construction and response-model handling.
+    """
+    async def __call__(self, scope, receive, send):
+        chunks = []
+        more = True
+        while more:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+
+        try:
+            body = orjson.loads(b"".join(chunks))
+        except orjson.JSONDecodeError:
+            body = None
+        if not isinstance(body, dict):
+            await send_json(send, 400, BAD_BODY)
+            return
+
+        data = body.get("data") or {}
+        if not isinstance(data, dict):
+            await send_json(send, 400, BAD_BODY)
+            return
+
+        event = body.get("type") or body.get("event") or "unknown"
+        call_id = data.get("id") or data.get("callId") or body.get("callId") or "unknown"
+
+        # Some Vapi setups send running transcript or message chunks:
+        item = (
+            event,
+            call_id,
+            data.get("transcript") or body.get("transcript") or "",
+            data.get("messages") or [],
+            data.get("summary") or body.get("summary")
+        )
+        try:
+            EVENT_Q.put_nowait(item)
+        except asyncio.QueueFull:
+            # Backlogged: apply this one inline rather than drop it
+            await process_batch([item])
+
+        await send_json(send, 200, OK_BODY)
+
+# Starlette treats a callable instance (not a function) as a raw ASGI endpoint
+app.add_route("/vapi/events", VapiEventsEndpoint(), methods=["POST"])
+
+async def drain_events():
+    while True:
+        items = [await EVENT_Q.get()]
+        while not EVENT_Q.empty():
+            items.append(EVENT_Q.get_nowait())
+        stopping = DRAIN_STOP in items
+        items = [item for item in items if item is not DRAIN_STOP]
+
+        # One bad batch must not stop the drain; later events would otherwise pile up
+        try:
+            await process_batch(items)
+        except Exception:
+            logger.exception(f"Failed to apply {len(items)} webhook events")
+
+        if stopping:
+            return
+        await asyncio.sleep(EVENT_FLUSH_INTERVAL)
+
+async def process_batch(items) -> None:
+    """
+    Coalesce queued events per call (latest transcript and summary, all messages)
+    and apply each call's update once, with one state read and one write per batch.
+    """
+    if not items:
+        return
+
+    calls: Dict[str, Dict[str, Any]] = {}
+    for event, call_id, transcript, messages, summary in items:
+        pending = calls.setdefault(call_id, {"transcript": "", "messages": [], "summary": None, "ended": False})
+        if transcript:
+            pending["transcript"] = transcript
+        pending["messages"].extend(messages)
+        if summary:
+            pending["summary"] = summary
+        if event in CALL_END_EVENTS:
+            pending["ended"] = True
+
+    states = await load_call_states(list(calls))
+    for call_id, pending in calls.items():
+        try:
+            apply_call_update(states[call_id], call_id, **pending)
+        except Exception:
+            # Isolate malformed events (e.g. a non-string transcript) to their own call
+            logger.exception(f"Failed to apply webhook events for call {call_id}")
+
+    # Ended calls have been reported, so their state is dropped rather than kept until expiry
+    finished = [call_id for call_id, pending in calls.items() if pending["ended"]]
+    for call_id in finished:
+        del states[call_id]
+    await save_call_states(states, finished)
+
+def new_call_state() -> Dict[str, Any]:
+    return {"transcript": "", "link_sent": False, "pitched": False, "summary": ""}
+
+async def load_call_states(call_ids) -> Dict[str, Dict[str, Any]]:
+    if REDIS is not None:
+        try:
+            async with REDIS.pipeline(transaction=False) as p:
+                for call_id in call_ids:
+                    p.hgetall(f"call:{call_id}")
+                rows = await p.execute()
+            return {
+                call_id: {
+                    "transcript": row.get("transcript", ""),
+                    "link_sent": row.get("link_sent") == "1",
+                    "pitched": row.get("pitched") == "1",
+                    "summary": row.get("summary", "")
+                } if row else new_call_state()
+                for call_id, row in zip(call_ids, rows)
+            }
+        except RedisError as e:
+            logger.warning(f"Redis read failed, using local call state: {e}")
+    return {call_id: CALL_STATE.get(call_id) or new_call_state() for call_id in call_ids}
+
+async def save_call_states(states: Dict[str, Dict[str, Any]], finished=()) -> None:
+    if REDIS is not None:
+        try:
+            async with REDIS.pipeline(transaction=False) as p:
+                for call_id in finished:
+                    p.delete(f"call:{call_id}")
+                for call_id, st in states.items():
+                    key = f"call:{call_id}"
+                    p.hset(key, mapping={
+                        "transcript": st["transcript"],
+                        "link_sent": "1" if st["link_sent"] else "0",
+                        "pitched": "1" if st["pitched"] else "0",
+                        "summary": str(st["summary"] or "")
+                    })
+                    p.expire(key, CALL_STATE_TTL)
+                await p.execute()
+            return
+        except RedisError as e:
+            logger.warning(f"Redis write failed, keeping call state locally: {e}")
+    for call_id in finished:
+        CALL_STATE.pop(call_id)
+    for call_id, st in states.items():
+        CALL_STATE.set(call_id, st)
+
+def apply_call_update(st: Dict[str, Any], call_id: str, transcript: str, messages, summary, ended: bool) -> None:
     if transcript:
+        previous = st["transcript"]
         st["transcript"] = transcript
-        if extract_link(transcript):
-            st["link_sent"] = True
+        if not (st["link_sent"] and st["pitched"]):
+            # Running transcripts grow by appending, so only scan the new tail
+            start = max(len(previous) - SCAN_OVERLAP, 0) if transcript.startswith(previous) else 0
+            tail = transcript[start:]
+            if not st["link_sent"] and extract_link(tail):
+                st["link_sent"] = True
+            if not st["pitched"] and PITCH_RE.search(tail):
+                st["pitched"] = True
 
     # If assistant messages are included
-    messages = data.get("messages") or []
     for m in messages:
+        if st["link_sent"]:
+            break
         if isinstance(m, dict):
             content = m.get("content") or ""
             if extract_link(content):
                 st["link_sent"] = True
 
     # Optional analysis summary payload
-    summary = data.get("summary") or body.get("summary")
     if summary:
         st["summary"] = summary
 
-    # On end, print summary + binary success
-    if event in ("call.ended", "ended", "call.completed"):
-        transcript_text = st["transcript"]
-        success = bool(st["link_sent"]) and ("ticket" in transcript_text.lower() or "single-game" in transcript_text.lower())
-        print("\n===== CALL ENDED =====")
-        print(f"Call ID: {call_id}")
-        print("Summary:", st.get("summary") or "(no summary provided)")
-        print("Binary Success (link sent?):", "SUCCESS" if success else "FAIL")
-        print("======================\n")
-
-    return JSONResponse({"ok": True})
+    # On end, report summary + binary success
+    if ended:
+        success = st["link_sent"] and st["pitched"]
+        logger.info(
+            "\n===== CALL ENDED =====\n"
+            f"Call ID: {call_id}\n"
+            f"Summary: {st.get('summary') or '(no summary provided)'}\n"
+            f"Binary Success (link sent?): {'SUCCESS' if success else 'FAIL'}\n"
+            "======================\n"
+        )
 
 # =========================
 # VAPI HELPER
@@ -127,49 +401,55 @@ def vapi_headers() -> Dict[str, str]:
         "Content-Type": "application/json",
     }
 
+# Call-independent part of the inline assistant; shared by every call and only ever
+# serialized, never mutated
+INLINE_ASSISTANT_BASE: Dict[str, Any] = {
+    "name": "SF Marketer (Inline)",
+    "model": {
+        "provider": "openai",
+        "model": "gpt-4o-mini-realtime-preview-2024-12-17",  # Vapi realtime-capable model tag
+        "temperature": 0.6,
+        "maxOutputTokens": 50
+    },
+    "voice": {
+        "provider": "openai",
+        "model": "tts-1-hd",
+        "voice": "ash"
+    },
+    "firstMessageMode": "assistant",   # assistant speaks first
+    # Transcriber (Vapi handles this internally, configure to your plan)
+    "transcriber": {
+        "provider": "deepgram",
+        "model": "nova-2",
+        "language": "en"
+    },
+    # Basic barge-in/latency controls (tune later)
+    "stopSpeakingPlan": {
+        "numWords": 4,
+        "voiceSeconds": 0.3,
+        "backoffSeconds": 3
+    },
+    # End message (Vapi will speak this when your logic ends the call)
+    "endCallMessage": "Goodbye."
+}
+
 def build_inline_assistant(system_prompt: str, first_message: str) -> Dict[str, Any]:
     """
-    Minimal inline Vapi assistant config. Adjust as needed for your account:
+    Minimal inline Vapi assistant config. Adjust INLINE_ASSISTANT_BASE as needed for your account:
       - model
       - voice
       - transcriber
       - analysis/success eval (if you enable in Vapi)
     """
     return {
-        "name": "SF Marketer (Inline)",
-        "model": {
-            "provider": "openai",
-            "model": "gpt-4o-mini-realtime-preview-2024-12-17",  # Vapi realtime-capable model tag
-            "temperature": 0.6,
-            "maxOutputTokens": 50
-        },
-        "voice": {
-            "provider": "openai",
-            "model": "tts-1-hd",
-            "voice": "ash"
-        },
-        "firstMessageMode": "assistant",   # assistant speaks first
+        **INLINE_ASSISTANT_BASE,
         "firstMessage": first_message,
         "systemPrompt": system_prompt,
         # Optional: send events to our webhook
-        "serverUrl": f"{PUBLIC_URL}/vapi/events",
-        # Transcriber (Vapi handles this internally, configure to your plan)
-        "transcriber": {
-            "provider": "deepgram",
-            "model": "nova-2",
-            "language": "en"
-        },
-        # Basic barge-in/latency controls (tune later)
-        "stopSpeakingPlan": {
-            "numWords": 4,
-            "voiceSeconds": 0.3,
-            "backoffSeconds": 3
-        },
-        # End message (Vapi will speak this when your logic ends the call)
-        "endCallMessage": "Goodbye."
+        "serverUrl": f"{PUBLIC_URL}/vapi/events"
     }
 
-def start_vapi_call(
+async def start_vapi_call(
     to_number: str,
     system_prompt: str,
     first_message: str,
@@ -178,9 +458,19 @@ def start_vapi_call(
     """
     Triggers an outbound call in Vapi.
     If assistant_id is provided, uses that assistant; otherwise sends inline assistant config.
+    A repeat of the same call within a minute returns the first call's response.
     """
-    url = "https://api.vapi.ai/call"  # Vapi's create-call endpoint (name may vary; use your workspace docs)
+    key = call_key(to_number, assistant_id or "", system_prompt, first_message)
+    return await INFLIGHT_CALLS.run(
+        key, lambda: _post_call(to_number, system_prompt, first_message, assistant_id)
+    )
 
+async def _post_call(
+    to_number: str,
+    system_prompt: str,
+    first_message: str,
+    assistant_id: Optional[str]
+) -> Dict[str, Any]:
     payload: Dict[str, Any] = {
         "phoneNumber": to_number,
         "assistant": {"assistantId": assistant_id} if assistant_id else build_inline_assistant(system_prompt, first_message),
@@ -188,9 +478,17 @@ def start_vapi_call(
         "serverUrl": f"{PUBLIC_URL}/vapi/events"
     }
 
-    r = requests.post(url, headers=vapi_headers(), data=json.dumps(payload), timeout=20)
+    # Vapi's create-call endpoint (name may vary; use your workspace docs)
+    # Content-Type is already set on the shared client via vapi_headers()
+    r = await app.state.http.post("/call", content=orjson.dumps(payload))
     r.raise_for_status()
-    return r.json()
+    resp = orjson.loads(r.content)
+
+    # Only a newly placed call starts with fresh state; deduplicated repeats return the
+    # cached response without reaching here, so a live call's state is never reset
+    call_id = resp.get("id") or resp.get("callId") or "unknown"
+    await save_call_states({call_id: new_call_state()})
+    return resp
 
 # =========================
 # MCP SERVER
@@ -199,16 +497,6 @@ from mcp.server.fastmcp import FastMCP, Context
 
 mcp = FastMCP("vapi-ticket-sales-rep")
 
-@mcp.tool()
-def ping(ctx: Context) -> str:          # ← rename '_' to 'ctx'
-    "Health check."
-    return "pong"
-
-@mcp.tool()
-def start_call(ctx: Context, variables_json: str = "{}") -> str:  # name is fine
-    ...
-
-
 @mcp.tool()
 def ping(_: Context) -> str:
     "Health check."
@@ -230,7 +518,7 @@ def start_call(ctx: Context, variables_json: str = "{}") -> str:
     }
     """
     try:
-        variables = json.loads(variables_json or "{}")
+        variables = orjson.loads(variables_json or "{}")
     except Exception as e:
         return f"Invalid JSON for variables_json: {e}"
 
@@ -240,25 +528,45 @@ def start_call(ctx: Context, variables_json: str = "{}") -> str:
     variables.setdefault("fallback_link", PURCHASE_LINK_FALLBACK)
 
     # Render prompts
-    system_prompt = SYSTEM_TEMPLATE.render(**variables)
-    first_message = FIRST_MESSAGE_TEMPLATE.render(**variables)
-
-    # Trigger Vapi call
-    resp = start_vapi_call(
-        to_number=TO_NUMBER,
-        system_prompt=system_prompt,
-        first_message=first_message,
-        assistant_id=VAPI_ASSISTANT_ID or None
-    )
+    system_prompt, first_message = render_prompts(variables)
+
+    # Trigger Vapi call on the webhook server's loop, where the shared client lives
+    resp = asyncio.run_coroutine_threadsafe(
+        start_vapi_call(
+            to_number=TO_NUMBER,
+            system_prompt=system_prompt,
+            first_message=first_message,
+            assistant_id=VAPI_ASSISTANT_ID or None
+        ),
+        HTTP_LOOP
+    ).result(timeout=30)
     call_id = resp.get("id") or resp.get("callId") or "unknown"
-    CALL_STATE[call_id] = {"transcript": "", "link_sent": False, "summary": ""}
 
     return f"Dialing {TO_NUMBER}. Vapi call id: {call_id}"
 
 def start_http():
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="warning")
+    # Only needed when serving webhooks; deferred so importing this module stays fast
+    import uvicorn
+    # uvloop and httptools ship with uvicorn[standard]; the per-request access log is the
+    # main remaining cost on the /vapi/events hot path, so it's off
+    config = uvicorn.Config(
+        app, host="0.0.0.0", port=8000, log_level="warning",
+        loop="uvloop", http="httptools", access_log=False
+    )
+
+    class ReadyServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            # Lifespan has run and the socket is bound; tools can start dialing
+            if self.started:
+                HTTP_READY.set()
+
+    ReadyServer(config).run()
 
 def main():
+    # basicConfig logs to stderr, keeping stdout free for the MCP stdio transport
+    logging.basicConfig(level=logging.INFO)
+
     # sanity
     for k in ["VAPI_API_KEY", "TO_NUMBER", "PUBLIC_URL"]:
         if not globals()[k]:
@@ -267,7 +575,8 @@ def main():
     # start webhook server
     t = threading.Thread(target=start_http, daemon=True)
     t.start()
-    time.sleep(0.8)
+    if not HTTP_READY.wait(timeout=5.0):
+        raise RuntimeError("Webhook server did not start")
 
     # Run MCP (stdio)
     mcp.run()